@@ -1,10 +1,14 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
+from contextlib import asynccontextmanager
+import asyncio
 import sys
-import json
+import threading
+import orjson
 import os
 
 # Add project root to path
@@ -14,10 +18,58 @@ sys.path.append(str(project_root))
 from baseline.pipeline import RAGPipeline
 from utils.logger import RAGLogger
 
+# Pipeline is built during ingestion rather than at import: PDF extraction
+# workers re-import the main script, and must not load the models again
+pipeline: Optional[RAGPipeline] = None
+logger = RAGLogger(project_root / "logs")
+
+data_dir = project_root / "data"
+index_path = project_root / "cache" / "index.faiss"
+
+# Bound how many pipeline queries run on worker threads at once
+MAX_CONCURRENT_QUERIES = int(os.getenv("MAX_CONCURRENT_QUERIES", "4"))
+query_semaphore = asyncio.Semaphore(MAX_CONCURRENT_QUERIES)
+
+async def run_query(question: str) -> Dict[str, Any]:
+    """Run a blocking pipeline query on a worker thread, keeping the event loop free"""
+    async with query_semaphore:
+        return await pipeline.aquery(question)
+
+def ingest_documents():
+    """Load the models and add data, reusing embeddings persisted by a previous run"""
+    global pipeline
+    pipeline = RAGPipeline(
+        model_name="google/flan-t5-base",
+        retriever_model='all-MiniLM-L6-v2',
+        log_dir=str(project_root / "logs")
+    )
+    pipeline.load_if_exists(str(index_path))
+    pipeline.add_documents(directory=str(data_dir))
+    pipeline.save(str(index_path))
+
+async def ingest_in_background(app: FastAPI):
+    """Ingest documents off the event loop and mark the app ready when done"""
+    try:
+        await asyncio.to_thread(ingest_documents)
+        app.state.ready = True
+        print("Document ingestion complete")
+    except Exception as e:
+        print(f"Document ingestion failed: {str(e)}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start serving immediately; queries are rejected until ingestion finishes
+    app.state.ready = False
+    ingest_task = asyncio.create_task(ingest_in_background(app))
+    yield
+    ingest_task.cancel()
+
 app = FastAPI(
     title="RAG System API",
     description="API for retrieving and generating answers using RAG system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -29,18 +81,6 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
-# Initialize pipeline and logger
-pipeline = RAGPipeline(
-    model_name="google/flan-t5-base",
-    retriever_model='all-MiniLM-L6-v2',
-    log_dir=str(project_root / "logs")
-)
-logger = RAGLogger(project_root / "logs")
-
-# Add data
-data_dir = project_root / "data"
-pipeline.add_documents(directory=str(data_dir))
-
 class Question(BaseModel):
     question: str
 
@@ -61,6 +101,11 @@ class QueryResponse(BaseModel):
 class BatchResponse(BaseModel):
     results: List[QueryResponse]
 
+def ensure_ready():
+    """Reject requests while documents are still being ingested"""
+    if not getattr(app.state, "ready", False):
+        raise HTTPException(status_code=503, detail="Documents are still being ingested")
+
 @app.post("/query", response_model=QueryResponse)
 async def process_question(question: Question):
     """
@@ -72,9 +117,10 @@ async def process_question(question: Question):
     Returns:
         Response containing retrieved chunks, prompt, and generated answer
     """
+    ensure_ready()
     try:
         # Process question using pipeline
-        result = pipeline.query(question.question)
+        result = await run_query(question.question)
         
         # Log the query
         logger.log_query(
@@ -113,9 +159,11 @@ async def process_batch(questions: BatchQuestions):
     Returns:
         List of responses containing retrieved chunks, prompts, and generated answers
     """
+    ensure_ready()
     try:
-        # Process questions using pipeline
-        results = pipeline.batch_query(questions.questions)
+        # Process questions using pipeline; batch_query runs one batched generate call
+        async with query_semaphore:
+            results = await pipeline.abatch_query(questions.questions)
         
         # Prepare responses
         responses = []
@@ -156,10 +204,95 @@ async def root():
         "endpoints": {
             "/query": "POST - Process a single question",
             "/batch": "POST - Process multiple questions",
+            "/healthz": "GET - Readiness check",
             "/": "GET - This information page"
         }
     }
 
+@app.get("/healthz")
+async def healthz():
+    """Readiness check: 503 until document ingestion has finished"""
+    if not getattr(app.state, "ready", False):
+        return ORJSONResponse(status_code=503, content={"status": "starting"})
+    status = {"status": "ok"}
+    if pipeline.cache is not None:
+        status["cache"] = {
+            "entries": len(pipeline.cache.entries),
+            "hits": pipeline.cache.hits,
+            "misses": pipeline.cache.misses,
+            "hit_rate": pipeline.cache.hit_rate
+        }
+    return status
+
+# Parsed test log files: path -> (mtime, bytes consumed, lines consumed, entries)
+_LOG_CACHE: Dict[Path, Tuple[float, int, int, List[Dict[str, Any]]]] = {}
+_log_cache_lock = threading.Lock()
+
+def _parse_log_lines(data: bytes, filename: str, first_line: int) -> List[Dict[str, Any]]:
+    """Parse JSONL bytes, skipping blank and malformed lines"""
+    entries = []
+    for line_num, line in enumerate(data.split(b'\n'), first_line):
+        if line.strip():
+            try:
+                entries.append(orjson.loads(line))
+            except orjson.JSONDecodeError as e:
+                print(f"Error parsing JSON in {filename} at line {line_num}: {e}")
+    return entries
+
+def _read_log_file(file_path: Path) -> List[Dict[str, Any]]:
+    """
+    Return the entries of one log file, re-parsing only what changed since the
+    last call. Appended lines are read from the previous end offset; any other
+    change triggers a full re-parse.
+    """
+    st = file_path.stat()
+    cached = _LOG_CACHE.get(file_path)
+    if cached is not None and cached[0] == st.st_mtime and cached[1] == st.st_size:
+        return cached[3]
+    
+    if cached is not None and st.st_size > cached[1]:
+        offset, lines_read, entries = cached[1], cached[2], list(cached[3])
+    else:
+        offset, lines_read, entries = 0, 0, []
+    
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+    
+    # Leave a partially written last line for the next call
+    complete = len(data) if data.endswith(b'\n') else data.rfind(b'\n') + 1
+    entries.extend(_parse_log_lines(data[:complete], file_path.name, lines_read + 1))
+    _LOG_CACHE[file_path] = (st.st_mtime, offset + complete, lines_read + data.count(b'\n', 0, complete), entries)
+    return entries
+
+def read_test_logs() -> List[Dict[str, Any]]:
+    """Read every entry from the test_rag_logs files (blocking file I/O)"""
+    log_data = []
+    logs_dir = project_root / "logs"
+    
+    # Check if logs directory exists
+    if not logs_dir.exists():
+        print(f"Logs directory not found at: {logs_dir}")
+        return []
+        
+    # Read only test log files
+    log_files = [f for f in os.listdir(logs_dir) if f.startswith("test_rag_logs_") and f.endswith(".jsonl")]
+    
+    if not log_files:
+        print(f"No test log files found in: {logs_dir}")
+        return []
+    
+    with _log_cache_lock:
+        for filename in log_files:
+            try:
+                log_data.extend(_read_log_file(logs_dir / filename))
+            except Exception as e:
+                print(f"Error reading file {filename}: {e}")
+                continue
+    
+    print(f"Successfully loaded {len(log_data)} test log entries")
+    return log_data
+
 @app.get("/api/logs")
 async def get_logs():
     """
@@ -169,41 +302,7 @@ async def get_logs():
         List of log entries containing questions, retrieved chunks, and generated answers
     """
     try:
-        log_data = []
-        logs_dir = project_root / "logs"
-        
-        # Check if logs directory exists
-        if not logs_dir.exists():
-            print(f"Logs directory not found at: {logs_dir}")
-            return []
-            
-        # Read only test log files
-        log_files = [f for f in os.listdir(logs_dir) if f.startswith("test_rag_logs_") and f.endswith(".jsonl")]
-        
-        if not log_files:
-            print(f"No test log files found in: {logs_dir}")
-            return []
-            
-        for filename in log_files:
-            try:
-                file_path = logs_dir / filename
-                print(f"Reading test log file: {file_path}")
-                
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    for line_num, line in enumerate(f, 1):
-                        if line.strip():
-                            try:
-                                log_entry = json.loads(line)
-                                log_data.append(log_entry)
-                            except json.JSONDecodeError as e:
-                                print(f"Error parsing JSON in {filename} at line {line_num}: {e}")
-                                continue
-            except Exception as e:
-                print(f"Error reading file {filename}: {e}")
-                continue
-        
-        print(f"Successfully loaded {len(log_data)} test log entries")
-        return log_data
+        return await asyncio.to_thread(read_test_logs)
         
     except Exception as e:
         print(f"Error in get_logs: {str(e)}")
@@ -1,9 +1,10 @@
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 import torch
-from typing import Optional, List, Dict
+from typing import Optional, List
 from pathlib import Path
 import sys
 import os
+import functools
 
 # Add the project root to the Python path
 project_root = Path(__file__).parent.parent.parent
@@ -11,50 +12,194 @@ sys.path.append(str(project_root))
 
 from baseline.retriever.retriever import Retriever
 
+# ONNX Runtime support is optional: pip install optimum[onnxruntime]
+try:
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+except ImportError:
+    ORTModelForSeq2SeqLM = None
+
+ONNX_FILE_NAMES = ("encoder_model", "decoder_model", "decoder_with_past_model")
+
+# Maximum number of input tokens fed to the model
+MAX_INPUT_LENGTH = 1024
+
+# Number of prompts decoded together by `generate_answers`
+GENERATE_BATCH_SIZE = 8
+
+PROMPT_TEMPLATE = """
+        **Task:** Answer the question using ONLY the provided context.  
+        **Rules:**  
+        - **MUST** include all key details.  
+        - If the answer is not in the context, say "cannot find."  
+        - Organize information clearly.  
+
+        **Context:**  
+        {context}  
+
+        **Question:**  
+        {question}  
+
+        **Answer (detailed, in complete sentences):**  
+        """.strip()
+
+# The fixed text around the context and question slots
+PROMPT_PREFIX, _, _rest = PROMPT_TEMPLATE.partition("{context}")
+PROMPT_MIDDLE, _, PROMPT_SUFFIX = _rest.partition("{question}")
+
+def _clean_context(context: str) -> str:
+    """Remove score tags to avoid confusion."""
+    return "\n".join(
+        line.split("] ")[1] if "] " in line else line
+        for line in context.split("\n")
+    )
+
+@functools.lru_cache(maxsize=512)
+def _build_prompt(context: str, question: str) -> str:
+    """Prompt text for a context and question; cached since callers often build it twice."""
+    return PROMPT_PREFIX + _clean_context(context) + PROMPT_MIDDLE + question + PROMPT_SUFFIX
+
+def export_onnx(model_name: str, output_dir: str, quantize: bool = True):
+    """
+    Export a seq2seq model to ONNX, optionally with dynamic int8 quantization.
+    
+    Args:
+        model_name (str): Name of the Hugging Face model to export
+        output_dir (str): Directory to write the ONNX files and tokenizer to
+        quantize (bool): Also write dynamically quantized int8 copies of each file
+    """
+    if ORTModelForSeq2SeqLM is None:
+        raise ImportError("ONNX export requires optimum: pip install optimum[onnxruntime]")
+    
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True, use_cache=True)
+    model.save_pretrained(output_dir)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(output_dir)
+    
+    if quantize:
+        qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        for name in ONNX_FILE_NAMES:
+            quantizer = ORTQuantizer.from_pretrained(output_dir, file_name=f"{name}.onnx")
+            quantizer.quantize(save_dir=output_dir, quantization_config=qconfig)
+
 class Generator:
-    def __init__(self, model_name: str = "google/flan-t5-base", retriever: Optional[Retriever] = None):
+    def __init__(self,
+                 model_name: str = "google/flan-t5-base",
+                 retriever: Optional[Retriever] = None,
+                 onnx_dir: Optional[str] = None,
+                 greedy: bool = False,
+                 compile_model: Optional[bool] = None):
         """
         Initialize the Generator with a specific model and optional retriever.
         
         Args:
             model_name (str): Name of the model to use. Defaults to flan-t5-base.
             retriever (Retriever, optional): Retriever instance for context retrieval
+            onnx_dir (str, optional): Directory written by `export_onnx`. When
+                given, the model runs on ONNX Runtime (requires optimum).
+            greedy (bool): Use deterministic greedy decoding instead of sampled
+                4-beam search. Roughly 4x faster at some cost in answer quality.
+            compile_model (bool): Compile the PyTorch model's forward pass with
+                torch.compile, using dynamic shapes so varying input lengths
+                reuse one graph; compilation happens in a warm-up call at load
+                time. Defaults to the TEXTFINDER_COMPILE environment variable
+                ("1" enables it).
         """
         self.model_name = model_name
+        self.onnx_dir = onnx_dir
+        self.greedy = greedy
+        if compile_model is None:
+            compile_model = os.getenv("TEXTFINDER_COMPILE", "0") == "1"
+        self.compile_model = compile_model
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.tokenizer = None
         self.model = None
         self.retriever = retriever
         self.load_model()
         
+        # Settings that determine the answers; cached answers are only reusable if they match
+        self.config = {
+            'model_name': model_name,
+            'onnx_dir': onnx_dir,
+            'greedy': greedy,
+            'compile_model': self.compile_model,
+            'prompt_template': PROMPT_TEMPLATE,
+            'max_input_length': MAX_INPUT_LENGTH
+        }
+        
     def load_model(self):
         """Load the model and tokenizer."""
         self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        self.model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
+        
+        # The template text never changes, so tokenize it once
+        self._prefix_ids = self._tokenize(PROMPT_PREFIX)
+        self._middle_ids = self._tokenize(PROMPT_MIDDLE)
+        self._suffix_ids = self._tokenize(PROMPT_SUFFIX)
+        
+        # Repeated (context, question) pairs skip tokenization; cleared with the tokenizer
+        self._encode_prompt_cached = functools.lru_cache(maxsize=256)(self._encode_prompt)
+        
+        if self.onnx_dir:
+            # An explicitly requested ONNX model must not silently fall back to PyTorch
+            if ORTModelForSeq2SeqLM is None:
+                raise ImportError("The ONNX generator requires optimum: pip install optimum[onnxruntime]")
+            if not Path(self.onnx_dir).is_dir():
+                raise FileNotFoundError(f"ONNX export not found at {self.onnx_dir}; create it with export_onnx")
+            
+            # Prefer the int8 quantized files when they were exported
+            onnx_dir = Path(self.onnx_dir)
+            suffix = "_quantized" if (onnx_dir / "encoder_model_quantized.onnx").exists() else ""
+            self.model = ORTModelForSeq2SeqLM.from_pretrained(
+                onnx_dir,
+                provider="CPUExecutionProvider",
+                use_cache=True,
+                encoder_file_name=f"encoder_model{suffix}.onnx",
+                decoder_file_name=f"decoder_model{suffix}.onnx",
+                decoder_with_past_file_name=f"decoder_with_past_model{suffix}.onnx"
+            )
+            # ONNX Runtime runs its own optimized graph on CPU
+            self.device = "cpu"
+            self.compile_model = False
+        else:
+            # Half precision on GPU; fp32 on CPU where bf16/fp16 kernels are slow
+            if self.device == "cuda":
+                dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+            else:
+                dtype = torch.float32
+            self.model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name, torch_dtype=dtype)
+            self.model = self.model.to(self.device).eval()
+            
+            # Compile forward rather than the module: generate() calls the
+            # underlying module, which would bypass a compiled wrapper
+            if self.compile_model:
+                self.model.forward = torch.compile(self.model.forward, dynamic=True)
+                self._warmup()
+                
+    def _warmup(self):
+        """Run one short generation so compilation happens at load, not on the first query."""
+        input_ids = torch.tensor([self._encode_prompt("", "warm-up")])
+        self._generate(input_ids, torch.ones_like(input_ids))
+        
+    def _tokenize(self, text: str) -> List[int]:
+        """Token ids for a piece of text, without special tokens."""
+        return self.tokenizer(text, add_special_tokens=False)["input_ids"]
         
     def build_prompt(self, context: str, question: str) -> str:
         """Build a clearer and more structured prompt."""
-        # Remove score tags to avoid confusion
-        cleaned_context = "\n".join(
-        line.split("] ")[1] if "] " in line else line 
-        for line in context.split("\n")
-    )
+        return _build_prompt(context, question)
     
-        prompt = f"""
-        **Task:** Answer the question using ONLY the provided context.  
-        **Rules:**  
-        - **MUST** include all key details.  
-        - If the answer is not in the context, say "cannot find."  
-        - Organize information clearly.  
-
-        **Context:**  
-        {cleaned_context}  
-
-        **Question:**  
-        {question}  
-
-        **Answer (detailed, in complete sentences):**  
+    def _encode_prompt(self, context: str, question: str) -> List[int]:
         """
-        return prompt.strip()
+        Token ids of `build_prompt(context, question)`, tokenizing only the
+        context and question and reusing the cached template ids. When too
+        long, the context is truncated so the instructions and question survive.
+        """
+        context_ids = self._tokenize(_clean_context(context))
+        question_ids = self._tokenize(question)
+        fixed = len(self._prefix_ids) + len(self._middle_ids) + len(self._suffix_ids) + len(question_ids) + 1
+        context_ids = context_ids[:max(0, MAX_INPUT_LENGTH - fixed)]
+        
+        input_ids = self._prefix_ids + context_ids + self._middle_ids + question_ids + self._suffix_ids
+        return input_ids[:MAX_INPUT_LENGTH - 1] + [self.tokenizer.eos_token_id]
 
     def generate_answer(self, question: str, context: Optional[str] = None, k: int = 3) -> str:
         """
@@ -85,16 +230,49 @@ class Generator:
         if context is None:
             context = ""
             
-        # Build the prompt
-        prompt = self.build_prompt(context, question)
+        # Tokenize the prompt
+        input_ids = torch.tensor([self._encode_prompt_cached(context, question)])
         
-        # Tokenize the input
-        inputs = self.tokenizer(prompt, return_tensors="pt", truncation=True, max_length=1024)
+        return self._generate(input_ids, torch.ones_like(input_ids))[0]
+    
+    def generate_answers(self, contexts: List[str], questions: List[str]) -> List[str]:
+        """
+        Generate answers for several questions in padded micro-batches.
         
-        # Generate the answer
-        outputs = self.model.generate(
-            inputs["input_ids"],
-              max_length=1024,  # Increased length
+        Prompts are encoded with `_encode_prompt`, so long contexts are
+        truncated without cutting off the question.
+        
+        Args:
+            contexts (List[str]): Context for each question
+            questions (List[str]): Questions to answer
+            
+        Returns:
+            List[str]: Generated answers, in the same order as the questions
+        """
+        encoded = [self._encode_prompt_cached(context, question) for context, question in zip(contexts, questions)]
+        
+        # Batch prompts of similar length together to keep padding small
+        order = sorted(range(len(encoded)), key=lambda i: len(encoded[i]))
+        answers = [None] * len(encoded)
+        for start in range(0, len(order), GENERATE_BATCH_SIZE):
+            batch = order[start:start + GENERATE_BATCH_SIZE]
+            width = max(len(encoded[i]) for i in batch)
+            input_ids = torch.full((len(batch), width), self.tokenizer.pad_token_id, dtype=torch.long)
+            attention_mask = torch.zeros_like(input_ids)
+            for row, i in enumerate(batch):
+                input_ids[row, :len(encoded[i])] = torch.tensor(encoded[i])
+                attention_mask[row, :len(encoded[i])] = 1
+            
+            for i, answer in zip(batch, self._generate(input_ids, attention_mask)):
+                answers[i] = answer
+        return answers
+    
+    def _generate(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> List[str]:
+        """Run the model on a batch of token ids and decode the answers."""
+        if self.greedy:
+            decoding = dict(num_beams=1, do_sample=False)
+        else:
+            decoding = dict(
                 num_beams=4,
                 length_penalty=1.5,  # Slightly lower penalty
                 early_stopping=True,
@@ -102,12 +280,20 @@ class Generator:
                 do_sample=True,   # Enable sampling
                 top_p=0.95,       # Broader nucleus sampling
                 top_k=50         # Larger top-k
-                )
+            )
+        
+        # Generate the answers without autograd bookkeeping
+        with torch.inference_mode():
+            outputs = self.model.generate(
+                input_ids.to(self.device),
+                attention_mask=attention_mask.to(self.device),
+                max_length=1024,  # Increased length
+                **decoding
+            )
         
-        # Decode and return the answer
-        answer = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-        # print("context answer : ", answer.strip())
-        return answer.strip()
+        # Decode and return the answers
+        answers = self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+        return [answer.strip() for answer in answers]
 
 def main():
     """Example usage of the Generator with Retriever"""
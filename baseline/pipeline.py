@@ -1,5 +1,7 @@
 from pathlib import Path
 from typing import List, Dict, Any, Optional
+import asyncio
+import hashlib
 import sys
 
 # Add project root to path
@@ -9,12 +11,16 @@ sys.path.append(str(project_root))
 from baseline.retriever.retriever import Retriever
 from baseline.generator.generator import Generator
 from utils.logger import RAGLogger
+from utils.semantic_cache import SemanticCache
 
 class RAGPipeline:
     def __init__(self, 
                  model_name: str = "google/flan-t5-base",
                  retriever_model: str = 'all-MiniLM-L6-v2',
-                 log_dir: str = "logs"):
+                 log_dir: str = "logs",
+                 use_cache: bool = True,
+                 cache_threshold: float = 0.95,
+                 cache_ttl: float = 300.0):
         """
         Initialize the RAG Pipeline combining retriever and generator.
         
@@ -22,10 +28,18 @@ class RAGPipeline:
             model_name (str): Name of the generator model
             retriever_model (str): Name of the retriever model
             log_dir (str): Directory for storing logs
+            use_cache (bool): Answer near-duplicate questions from a semantic cache
+            cache_threshold (float): Cosine similarity required for a cache hit
+            cache_ttl (float): Seconds a cached answer stays valid
         """
         self.retriever = Retriever(model_name=retriever_model)
         self.generator = Generator(model_name=model_name, retriever=self.retriever)
         self.logger = RAGLogger(log_dir=log_dir)
+        self.cache = SemanticCache(
+            self.retriever.embedding_dim,
+            threshold=cache_threshold,
+            ttl=cache_ttl
+        ) if use_cache else None
         
     def add_documents(self, 
                      documents: Optional[List[str]] = None,
@@ -45,6 +59,74 @@ class RAGPipeline:
                 
         if directory:
             self.retriever.add_directory(directory, glob_pattern)
+        
+        # Cached answers were built from the previous corpus
+        if self.cache is not None:
+            self.cache.clear()
+            
+    def load_if_exists(self, index_path: str) -> bool:
+        """
+        Restore a previously saved retriever index, if there is one.
+        
+        Args:
+            index_path (str): Path of the saved FAISS index
+            
+        Returns:
+            bool: True if an index was loaded
+        """
+        if not Path(index_path).exists():
+            return False
+        try:
+            self.retriever.load_index(index_path)
+        except ValueError as e:
+            # Stale index from another model or chunking setup; rebuild instead
+            print(f"Ignoring saved index: {str(e)}")
+            return False
+        if self.cache is not None:
+            self.cache.clear()
+        return True
+        
+    def save(self, index_path: str):
+        """
+        Persist the retriever index so the next start can skip re-embedding.
+        
+        Args:
+            index_path (str): Path to write the FAISS index to
+        """
+        Path(index_path).parent.mkdir(parents=True, exist_ok=True)
+        self.retriever.save_index(index_path)
+            
+    def _cache_key(self) -> str:
+        """Fingerprint of the models, prompt, decoding settings and indexed chunks that cached answers depend on"""
+        digest = hashlib.sha256(repr((self.generator.config, self.retriever.config)).encode('utf-8'))
+        for chunk_hash in sorted(self.retriever.hash_to_row):
+            digest.update(chunk_hash)
+        return digest.hexdigest()
+        
+    def load_cache(self, cache_path: str) -> bool:
+        """
+        Restore semantic cache entries saved by `save_cache`. Entries saved
+        against different models or documents are ignored.
+        
+        Args:
+            cache_path (str): Path of the saved cache
+            
+        Returns:
+            bool: True if cached entries were loaded
+        """
+        if self.cache is None:
+            return False
+        return self.cache.load(cache_path, key=self._cache_key())
+        
+    def save_cache(self, cache_path: str):
+        """
+        Persist the semantic cache so repeated runs can skip generation.
+        
+        Args:
+            cache_path (str): Path to write the cache to
+        """
+        if self.cache is not None:
+            self.cache.save(cache_path, key=self._cache_key())
             
     def query(self, 
               question: str,
@@ -65,29 +147,78 @@ class RAGPipeline:
                 - prompt: Final prompt sent to generator
                 - retrieval_scores: Similarity scores for chunks
         """
-        # Retrieve relevant chunks
-        chunks = self.retriever.query(question, k=k)
-        context = "\n".join([chunk['text'] for chunk in chunks])
+        # Embed the question once; reused for the cache lookup and for retrieval
+        question_embedding = self.retriever.embed_queries([question])
         
-        # Generate answer
-        answer = self.generator.generate_answer(question)
+        # Serve near-duplicate questions from the semantic cache
+        result = None
+        if self.cache is not None:
+            result = self.cache.get(question_embedding, tag=k)
+        
+        if result is None:
+            # Retrieve relevant chunks
+            chunks = self.retriever.query_embedded(question_embedding, k=k)
+            chunk_texts = [chunk['text'] for chunk in chunks]
+            context = "\n".join(chunk_texts)
+            
+            # Generate answer from the already retrieved context
+            answer = self.generator.generate_answer(question, context=context)
+            
+            result = {
+                "answer": answer,
+                "retrieved_chunks": chunk_texts,
+                "prompt": self.generator.build_prompt(context, question),
+                "retrieval_scores": [chunk['score'] for chunk in chunks]
+            }
+            if self.cache is not None:
+                self.cache.put(question_embedding, result, tag=k)
         
         # Log the query
         self.logger.log_query(
             question=question,
-            retrieved_chunks=[chunk['text'] for chunk in chunks],
-            prompt=self.generator.build_prompt(context, question),
-            generated_answer=answer,
-            retrieval_scores=[chunk['score'] for chunk in chunks],
+            retrieved_chunks=result['retrieved_chunks'],
+            prompt=result['prompt'],
+            generated_answer=result['answer'],
+            retrieval_scores=result['retrieval_scores'],
             group_id=group_id
         )
         
-        return {
-            "answer": answer,
-            "retrieved_chunks": [chunk['text'] for chunk in chunks],
-            "prompt": self.generator.build_prompt(context, question),
-            "retrieval_scores": [chunk['score'] for chunk in chunks]
-        }
+        return dict(result)
+        
+    async def aquery(self,
+                     question: str,
+                     k: int = 3,
+                     group_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Async variant of `query` that runs it on the default executor,
+        so callers can overlap queries with other work on the event loop.
+        
+        Args:
+            question (str): The question to answer
+            k (int): Number of chunks to retrieve
+            group_id (str, optional): Identifier for the query group
+            
+        Returns:
+            Same dict as `query`
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.query, question, k, group_id)
+        
+    async def abatch_query(self,
+                           questions: List[str],
+                           k: int = 3) -> List[Dict[str, Any]]:
+        """
+        Async variant of `batch_query`, run on the default executor.
+        
+        Args:
+            questions (List[str]): List of questions to process
+            k (int): Number of chunks to retrieve per question
+            
+        Returns:
+            List of results for each question
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.batch_query, questions, k)
         
     def batch_query(self, 
                    questions: List[str],
@@ -102,19 +233,61 @@ class RAGPipeline:
         Returns:
             List of results for each question
         """
-        results = []
-        for question in questions:
-            result = self.query(question, k=k)
-            results.append(result)
-        return results
+        if not questions:
+            return []
+        
+        # Embed every question in one call; reused for the cache and for retrieval
+        question_embeddings = self.retriever.embed_queries(questions)
+        
+        results = [None] * len(questions)
+        if self.cache is not None:
+            for i in range(len(questions)):
+                results[i] = self.cache.get(question_embeddings[i:i + 1], tag=k)
+        
+        pending = [i for i, result in enumerate(results) if result is None]
+        if pending:
+            # One FAISS search and batched generation for all uncached questions
+            all_chunks = self.retriever.query_embedded_batch(question_embeddings[pending], k=k)
+            contexts = ["\n".join(chunk['text'] for chunk in chunks) for chunks in all_chunks]
+            prompts = [
+                self.generator.build_prompt(context, questions[i])
+                for i, context in zip(pending, contexts)
+            ]
+            answers = self.generator.generate_answers(contexts, [questions[i] for i in pending])
+            
+            for i, chunks, prompt, answer in zip(pending, all_chunks, prompts, answers):
+                results[i] = {
+                    "answer": answer,
+                    "retrieved_chunks": [chunk['text'] for chunk in chunks],
+                    "prompt": prompt,
+                    "retrieval_scores": [chunk['score'] for chunk in chunks]
+                }
+                if self.cache is not None:
+                    self.cache.put(question_embeddings[i:i + 1], results[i], tag=k)
+        
+        self.logger.log_queries([
+            {
+                'question': question,
+                'retrieved_chunks': result['retrieved_chunks'],
+                'prompt': result['prompt'],
+                'generated_answer': result['answer'],
+                'retrieval_scores': result['retrieval_scores']
+            }
+            for question, result in zip(questions, results)
+        ])
+        
+        return [dict(result) for result in results]
 
 def main():
     """Example usage of the RAG Pipeline"""
     # Initialize pipeline
     pipeline = RAGPipeline()
     
-    # Add documents
+    # Add documents, reusing the index saved by a previous run (shared with the API)
+    index_path = "cache/index.faiss"
+    pipeline.load_if_exists(index_path)
     pipeline.add_documents(directory="data")
+    pipeline.save(index_path)
     
     # Example questions
     questions = [
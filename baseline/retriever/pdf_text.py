@@ -0,0 +1,70 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+import functools
+import multiprocessing
+import os
+
+import PyPDF2
+
+# PDFium (C++) extracts text several times faster than pure-Python PyPDF2; optional
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+# This module is kept free of heavy imports: it is the only module preloaded
+# into the forkserver. Workers still re-import the main script as __mp_main__,
+# so entry points must not load models at import time
+
+
+def pdf_page_count(file_path: str) -> int:
+    """Number of pages in a PDF"""
+    if pdfium is not None:
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    with open(file_path, 'rb') as f:
+        return len(PyPDF2.PdfReader(f).pages)
+
+
+def extract_pages(file_path: str, start: int, stop: int) -> str:
+    """Extract text from pages [start, stop) of a PDF (may run in a worker process)"""
+    if pdfium is not None:
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            return "".join(pdf[i].get_textpage().get_text_range() for i in range(start, stop))
+        finally:
+            pdf.close()
+    with open(file_path, 'rb') as f:
+        reader = PyPDF2.PdfReader(f)
+        return "".join(reader.pages[i].extract_text() or "" for i in range(start, stop))
+
+
+def page_ranges(num_pages: int) -> List[Tuple[int, int]]:
+    """Split a PDF's pages into one contiguous [start, stop) range per CPU"""
+    workers = os.cpu_count() or 1
+    step = -(-num_pages // workers)
+    return [(start, min(start + step, num_pages)) for start in range(0, num_pages, step)]
+
+
+@functools.lru_cache(maxsize=None)
+def extraction_pool() -> ProcessPoolExecutor:
+    """
+    Process pool for PDF page extraction, created on first use and shared for
+    the life of the process. Workers come from a forkserver (or spawn) context
+    rather than fork: forking a process that holds model weights and runs
+    worker threads is slow and can deadlock. With these contexts workers are
+    also started on demand, so a job with n page ranges starts at most n.
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    context = multiprocessing.get_context(method)
+    if method == 'forkserver':
+        # The default preload is __main__, which would run the entry point's
+        # module-level setup in the server; this module is all workers need
+        context.set_forkserver_preload([__name__])
+    return ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=context
+    )
@@ -2,13 +2,47 @@ from sentence_transformers import SentenceTransformer
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 import faiss
 import numpy as np
-from typing import List, Dict, Union
+import torch
+from typing import List, Dict, Optional, Union
 from pathlib import Path
-import PyPDF2  # For PDF handling
+from concurrent.futures import Future
+import fnmatch
+import functools
+import hashlib
+import os
+import pickle
 import re
 
+from baseline.retriever.embedders import DEFAULT_STATIC_MODEL, OnnxEmbedder, StaticEmbedder
+from baseline.retriever.pdf_text import extract_pages, extraction_pool, page_ranges, pdf_page_count
+from utils.embedding_cache import EmbeddingCache
+
+# Patterns used by Retriever._preprocess_text
+_WS_RE = re.compile(r'\s+')
+_SPECIAL_RE = re.compile(r'[^\w\s.,!?-]')
+_PUNCT_RE = re.compile(r'\s+([.,!?])')
+
+# HNSW graph parameters: neighbours per node, build-time and query-time beam widths
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# Rows per block when comparing new chunks with each other during dedupe, and
+# the nearest earlier chunks each new chunk is checked against
+DEDUPE_BLOCK_SIZE = 2048
+DEDUPE_NEIGHBOURS = 16
+# Build-time beam width of the throwaway HNSW graph used during dedupe
+DEDUPE_EF_CONSTRUCTION = 40
+
+# PDFs with fewer pages than this are extracted in-process; the pool isn't worth it
+PARALLEL_PDF_MIN_PAGES = 16
+
+
 class Retriever:
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', chunk_size: int = 512, chunk_overlap: int = 100):
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', chunk_size: int = 512, chunk_overlap: int = 100,
+                 index_type: str = 'hnsw', dedupe_threshold: Optional[float] = 0.95,
+                 embedder: str = 'sbert', embedding_cache_dir: Optional[Union[str, Path]] = None,
+                 store_fp16: bool = False):
         """
         Initialize the Retriever with a sentence transformer model and chunking parameters.
         
@@ -16,9 +50,58 @@ class Retriever:
             model_name: Name of the SentenceTransformer model to use
             chunk_size: Size of document chunks (in characters)
             chunk_overlap: Overlap between chunks (in characters)
+            index_type: 'hnsw' for approximate graph search (sub-linear in the
+                number of chunks) or 'flat' for an exact scan
+            dedupe_threshold: New chunks whose cosine similarity to an already
+                indexed chunk exceeds this are dropped. None disables dedupe.
+            embedder: 'sbert' runs the SentenceTransformer model in PyTorch;
+                'onnx' runs its int8 quantized ONNX export on ONNX Runtime,
+                typically 2-4x faster on CPU (requires optimum[onnxruntime]);
+                'model2vec' uses static embeddings, 100x+ faster at some cost in
+                retrieval quality. Bare model names such as the default select
+                minishlab/potion-base-8M (requires model2vec)
+            embedding_cache_dir: Directory of a persistent chunk embedding cache.
+                Chunks embedded in any earlier run are then read from disk
+                instead of re-encoded.
+            store_fp16: Keep vectors in the index as float16, halving index
+                memory and the bandwidth of each search scan at negligible
+                cost in retrieval quality for normalized embeddings
         """
-        self.model = SentenceTransformer(model_name)
+        if embedder not in ('sbert', 'onnx', 'model2vec'):
+            raise ValueError(f"Unsupported embedder: {embedder}")
+        if index_type not in ('hnsw', 'flat'):
+            raise ValueError(f"Unsupported index type: {index_type}")
+        self.index_type = index_type
+        self.store_fp16 = store_fp16
+        self.dedupe_threshold = dedupe_threshold
+        # Settings that determine the embeddings; a saved index is only reusable if they match
+        self.config = {
+            'model_name': model_name,
+            'embedder': embedder,
+            'chunk_size': chunk_size,
+            'chunk_overlap': chunk_overlap
+        }
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        if embedder == 'onnx':
+            self.device = "cpu"
+            self.model = OnnxEmbedder(model_name)
+        elif embedder == 'model2vec':
+            self.device = "cpu"
+            if '/' not in model_name:
+                model_name = DEFAULT_STATIC_MODEL
+            self.model = StaticEmbedder(model_name)
+        else:
+            self.model = SentenceTransformer(model_name, device=self.device)
+            if self.device == "cuda":
+                # fp16 roughly doubles encode throughput on GPU with no retrieval quality loss
+                self.model.half()
+        # Larger batches pay off on GPU; on CPU they only raise peak memory
+        self.encode_batch_size = 256 if self.device == "cuda" else 64
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
+        self.embedding_cache = EmbeddingCache(
+            str(embedding_cache_dir),
+            f"{embedder}:{model_name}"
+        ) if embedding_cache_dir is not None else None
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
@@ -28,7 +111,13 @@ class Retriever:
         )
         self.index = None
         self.documents = []
-        self.chunks = []
+        # Chunks are stored column-wise; row i of both lists is row i of the index
+        self.chunk_texts = []
+        self.chunk_metadata = []
+        self.hash_to_row = {}  # sha256 of chunk text -> row in the index
+        self.file_fingerprints = {}  # source path -> (mtime, size) when it was ingested
+        # Exact-match cache so a repeated query string skips the encoder forward pass
+        self._encode_query_cached = functools.lru_cache(maxsize=512)(self._encode_query)
         
     def add_documents(self, documents: List[Union[str, Dict]]):
         """
@@ -38,8 +127,23 @@ class Retriever:
         Args:
             documents: List of documents to add
         """
+        self._add_documents(documents)
+    
+    def _add_documents(self, documents: List[Union[str, Dict]],
+                       known_embeddings: Optional[Dict[bytes, np.ndarray]] = None):
+        """
+        Implementation of `add_documents`.
+        
+        Args:
+            documents: List of documents to add
+            known_embeddings: Embeddings of chunks by chunk hash, reused instead
+                of encoding those chunks again
+        """
         # Process documents into chunks
         new_chunks = []
+        new_metadata = []
+        new_hashes = []
+        seen_hashes = set()
         for doc in documents:
             if isinstance(doc, dict):
                 text = doc.get('text', '')
@@ -50,26 +154,192 @@ class Retriever:
             
             chunks = self.text_splitter.split_text(text)
             for chunk in chunks:
-                self.chunks.append({
-                    'text': chunk,
-                    'metadata': metadata
-                })
+                # Chunks already in the index (e.g. loaded from disk) are not re-embedded
+                chunk_hash = hashlib.sha256(chunk.encode('utf-8')).digest()
+                if chunk_hash in self.hash_to_row or chunk_hash in seen_hashes:
+                    continue
+                seen_hashes.add(chunk_hash)
                 new_chunks.append(chunk)
+                new_metadata.append(metadata)
+                new_hashes.append(chunk_hash)
         
         # Generate embeddings for new chunks
         if new_chunks:
-            new_embeddings = self.model.encode(new_chunks, show_progress_bar=True)
+            known = {
+                i: known_embeddings[chunk_hash]
+                for i, chunk_hash in enumerate(new_hashes)
+                if chunk_hash in known_embeddings
+            } if known_embeddings else None
+            new_embeddings = self._encode_chunks(new_chunks, known=known)
             
             # Initialize index if it doesn't exist
             if self.index is None:
-                self.index = faiss.IndexFlatL2(self.embedding_dim)
-                self.index.add(new_embeddings)
-            else:
-                self.index.add(new_embeddings)
+                self.index = self._create_index()
+            
+            # Map each chunk to the row it is stored in, or the row of its near-duplicate
+            rows = self._dedupe_rows(new_embeddings)
+            keep = [i for i, row in enumerate(rows) if row is None]
+            first_row = len(self.chunk_texts)
+            for position, i in enumerate(keep):
+                rows[i] = first_row + position
+                self.chunk_texts.append(new_chunks[i])
+                self.chunk_metadata.append(new_metadata[i])
+            for chunk_hash, row in zip(new_hashes, rows):
+                # Duplicates of other new chunks point at a position in `keep`
+                self.hash_to_row[chunk_hash] = row if row >= 0 else first_row + ~row
+            
+            if keep:
+                self.index.add(new_embeddings[keep])
         
         # Store original documents
         self.documents.extend(documents)
     
+    def _dedupe_rows(self, embeddings: np.ndarray) -> List[Optional[int]]:
+        """
+        Find new chunks that are near-duplicates of indexed chunks or of earlier
+        new chunks.
+        
+        Args:
+            embeddings: Normalized embeddings of the new chunks
+            
+        Returns:
+            Per chunk: None if it should be added; the index row it duplicates;
+            or ~j if it duplicates the j-th kept new chunk
+        """
+        rows = [None] * len(embeddings)
+        if self.dedupe_threshold is None or len(embeddings) == 0:
+            return rows
+        
+        # One batched search against everything already indexed
+        if self.index.ntotal > 0:
+            scores, indices = self.index.search(embeddings, 1)
+            existing = (indices[:, 0] >= 0) & (scores[:, 0] > self.dedupe_threshold)
+            for i in np.flatnonzero(existing):
+                rows[i] = int(indices[i, 0])
+        else:
+            existing = np.zeros(len(embeddings), dtype=bool)
+        
+        # Near-duplicate pairs among the new chunks. Each block is searched for
+        # its nearest neighbours in a scratch index of the earlier blocks, and
+        # compared exactly within itself, so memory stays bounded by the block size
+        if self.index_type == 'hnsw':
+            scratch = faiss.IndexHNSWFlat(self.embedding_dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            scratch.hnsw.efConstruction = DEDUPE_EF_CONSTRUCTION
+            scratch.hnsw.efSearch = max(HNSW_EF_SEARCH, DEDUPE_NEIGHBOURS)
+        else:
+            scratch = faiss.IndexFlatIP(self.embedding_dim)
+        pair_rows, pair_cols, pair_scores = [], [], []
+        for start in range(0, len(embeddings), DEDUPE_BLOCK_SIZE):
+            block = embeddings[start:start + DEDUPE_BLOCK_SIZE]
+            if scratch.ntotal > 0:
+                scores, indices = scratch.search(block, min(DEDUPE_NEIGHBOURS, scratch.ntotal))
+                r, j = np.nonzero((indices >= 0) & (scores > self.dedupe_threshold))
+                pair_rows.append(start + r)
+                pair_cols.append(indices[r, j])
+                pair_scores.append(scores[r, j])
+            
+            sims = block @ block.T
+            r, c = np.nonzero(np.tril(sims > self.dedupe_threshold, k=-1))
+            pair_rows.append(start + r)
+            pair_cols.append(start + c)
+            pair_scores.append(sims[r, c])
+            scratch.add(block)
+        
+        pair_rows = np.concatenate(pair_rows)
+        # Group the pairs by row, in row order
+        order = np.argsort(pair_rows, kind='stable')
+        pair_rows = pair_rows[order]
+        pair_cols = np.concatenate(pair_cols)[order]
+        pair_scores = np.concatenate(pair_scores)[order]
+        
+        # Chunks with no earlier near-duplicate are kept without further work.
+        # The rest follow the sequential rule: a chunk duplicates the most
+        # similar earlier chunk that was itself kept
+        kept = ~existing
+        bounds = np.searchsorted(pair_rows, np.arange(len(embeddings) + 1))
+        for i in np.unique(pair_rows):
+            if not kept[i]:
+                continue
+            candidates = pair_cols[bounds[i]:bounds[i + 1]]
+            mask = kept[candidates]
+            if mask.any():
+                kept[i] = False
+                rows[i] = int(candidates[mask][np.argmax(pair_scores[bounds[i]:bounds[i + 1]][mask])])
+        
+        # Point duplicates at their original's position among the kept chunks
+        kept_position = np.cumsum(kept) - 1
+        for i in np.flatnonzero(~kept & ~existing):
+            rows[i] = ~int(kept_position[rows[i]])
+        
+        return rows
+    
+    @property
+    def chunks(self) -> List[Dict]:
+        """Chunks as a list of {'text', 'metadata'} dicts (built on access)"""
+        return [
+            {'text': text, 'metadata': metadata}
+            for text, metadata in zip(self.chunk_texts, self.chunk_metadata)
+        ]
+    
+    def _create_index(self) -> faiss.Index:
+        """
+        Create an empty inner-product index. Embeddings are L2-normalized, so
+        inner product equals cosine similarity.
+        """
+        if self.index_type == 'hnsw':
+            if self.store_fp16:
+                index = faiss.IndexHNSWSQ(self.embedding_dim, faiss.ScalarQuantizer.QT_fp16, HNSW_M,
+                                          faiss.METRIC_INNER_PRODUCT)
+            else:
+                index = faiss.IndexHNSWFlat(self.embedding_dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+            return index
+        if self.store_fp16:
+            # fp16 needs no training; FAISS converts float32 input on add and search
+            return faiss.IndexScalarQuantizer(self.embedding_dim, faiss.ScalarQuantizer.QT_fp16,
+                                              faiss.METRIC_INNER_PRODUCT)
+        return faiss.IndexFlatIP(self.embedding_dim)
+    
+    def _encode_chunks(self, chunks: List[str], batch_size: Optional[int] = None,
+                       known: Optional[Dict[int, np.ndarray]] = None) -> np.ndarray:
+        """
+        Encode chunks in one batched call, longest first, to minimize padding waste.
+        
+        Args:
+            chunks: Chunk texts to encode
+            batch_size: Number of chunks per forward pass. Defaults to
+                `encode_batch_size` (256 on GPU, 64 on CPU)
+            known: Embeddings already at hand, by position in `chunks`
+            
+        Returns:
+            Normalized float32 embeddings, row-aligned with the input chunks
+        """
+        embeddings = np.empty((len(chunks), self.embedding_dim), dtype=np.float32)
+        
+        # Fill in what the persistent cache already has; only the rest is encoded
+        cached = self.embedding_cache.get_many(chunks) if self.embedding_cache is not None else {}
+        cached.update(known or {})
+        for i, embedding in cached.items():
+            embeddings[i] = embedding
+        misses = [i for i in range(len(chunks)) if i not in cached]
+        if not misses:
+            return embeddings
+        
+        order = sorted(misses, key=lambda i: len(chunks[i]), reverse=True)
+        sorted_embeddings = self.model.encode(
+            [chunks[i] for i in order],
+            batch_size=batch_size or self.encode_batch_size,
+            show_progress_bar=True,
+            normalize_embeddings=True,
+            convert_to_numpy=True
+        )
+        
+        # Undo the length sort so rows line up with self.chunk_texts
+        embeddings[order] = sorted_embeddings
+        if self.embedding_cache is not None:
+            self.embedding_cache.put_many([chunks[i] for i in order], embeddings[order])
+        return embeddings
+    
     def query(self, query_text: str, k: int = 5) -> List[Dict]:
         """
         Query the retriever for similar documents.
@@ -81,97 +351,387 @@ class Retriever:
         Returns:
             List of dictionaries containing 'text', 'metadata', and 'score'
         """
-        if self.index is None or len(self.chunks) == 0:
+        if self.index is None or not self.chunk_texts:
             return []
         
         # Embed the query
-        query_embedding = self.model.encode([query_text])
+        return self.query_embedded(self.embed_queries([query_text]), k=k)
+    
+    def query_embedded(self, query_embedding: np.ndarray, k: int = 5) -> List[Dict]:
+        """
+        Query the retriever with an already computed query embedding, skipping
+        the encode step.
+        
+        Args:
+            query_embedding: Normalized float32 array of shape (1, embedding_dim),
+                as returned by `embed_queries`
+            k: Number of results to return
+            
+        Returns:
+            List of dictionaries containing 'text', 'metadata', and 'score'
+        """
+        return self.query_embedded_batch(query_embedding, k=k)[0]
+    
+    def query_batch(self, queries: List[str], k: int = 5) -> List[List[Dict]]:
+        """
+        Query the retriever for several queries with one encode and one search call.
+        
+        Args:
+            queries: The query texts
+            k: Number of results to return per query
+            
+        Returns:
+            One list of result dictionaries per query, as returned by `query`
+        """
+        if self.index is None or not self.chunk_texts:
+            return [[] for _ in queries]
         
-        # Search the index
-        distances, indices = self.index.search(query_embedding, k)
+        return self.query_embedded_batch(self.embed_queries(queries), k=k)
+    
+    def query_embedded_batch(self, query_embeddings: np.ndarray, k: int = 5) -> List[List[Dict]]:
+        """
+        Search the index with already computed query embeddings.
+        
+        Args:
+            query_embeddings: Normalized float32 array of shape (n_queries, embedding_dim)
+            k: Number of results to return per query
+            
+        Returns:
+            One list of result dictionaries per query, as returned by `query`
+        """
+        if self.index is None or not self.chunk_texts:
+            return [[] for _ in range(len(query_embeddings))]
+        
+        # Search the index; FAISS returns inner products (cosine) sorted highest first
+        if hasattr(self.index, 'hnsw'):
+            self.index.hnsw.efSearch = max(HNSW_EF_SEARCH, k)
+        scores, indices = self.index.search(query_embeddings, k)
         
         # Prepare results
-        results = []
-        for idx, score in zip(indices[0], distances[0]):
-            if idx >= 0:  # FAISS may return -1 for invalid indices
-                chunk = self.chunks[idx]
-                # Convert distance to similarity score (lower distance = higher similarity)
-                similarity_score = 1.0 / (1.0 + float(score))
-                results.append({
-                    'text': chunk['text'],
-                    'metadata': chunk['metadata'],
-                    'score': similarity_score
-                })
+        all_results = []
+        for row_indices, row_scores in zip(indices, scores):
+            results = []
+            for idx, score in zip(row_indices, row_scores):
+                if idx >= 0:  # FAISS may return -1 for invalid indices
+                    results.append({
+                        'text': self.chunk_texts[idx],
+                        'metadata': self.chunk_metadata[idx],
+                        'score': float(score)
+                    })
+            all_results.append(results)
         
-        # Sort by similarity score (highest first)
-        results.sort(key=lambda x: x['score'], reverse=True)
-        return results
+        return all_results
+    
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Embed query strings into the same normalized space as the index.
+        
+        Args:
+            queries: Query texts
+            
+        Returns:
+            float32 array of shape (len(queries), embedding_dim)
+        """
+        if len(queries) == 1:
+            # Copy so callers can't mutate the cached array
+            return self._encode_query_cached(queries[0]).copy()
+        embeddings = self.model.encode(
+            queries,
+            normalize_embeddings=True,
+            convert_to_numpy=True
+        )
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+    
+    def _encode_query(self, query: str) -> np.ndarray:
+        """Embed a single query (wrapped by an LRU cache in __init__)"""
+        embedding = self.model.encode(
+            [query],
+            normalize_embeddings=True,
+            convert_to_numpy=True
+        )
+        return np.ascontiguousarray(embedding, dtype=np.float32)
     
     def save_index(self, filepath: str):
-        """Save the FAISS index to disk"""
-        if self.index is not None:
-            faiss.write_index(self.index, filepath)
+        """
+        Save the FAISS index to disk, with the chunks, chunk hashes and file
+        fingerprints in a sidecar pickle next to it. Both files are written to
+        temporary paths first and then moved into place. With nothing indexed
+        (e.g. every source file was deleted) any earlier save is removed, so it
+        cannot be restored later.
+        """
+        state_path = Path(filepath).with_suffix('.pkl')
+        if self.index is None:
+            Path(filepath).unlink(missing_ok=True)
+            state_path.unlink(missing_ok=True)
+            return
+        
+        tmp_index = f"{filepath}.tmp"
+        tmp_state = f"{state_path}.tmp"
+        faiss.write_index(self.index, tmp_index)
+        with open(tmp_state, 'wb') as f:
+            pickle.dump({
+                'config': self.config,
+                'chunk_texts': self.chunk_texts,
+                'chunk_metadata': self.chunk_metadata,
+                'documents': self.documents,
+                'hash_to_row': self.hash_to_row,
+                'file_fingerprints': self.file_fingerprints
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_index, filepath)
+        os.replace(tmp_state, state_path)
     
     def load_index(self, filepath: str):
-        """Load a FAISS index from disk"""
-        self.index = faiss.read_index(filepath)
+        """
+        Load a FAISS index and its sidecar state from disk.
+        
+        Args:
+            filepath: Path of the saved FAISS index
+        
+        Raises:
+            ValueError: If the sidecar is missing or does not match the index,
+                or the index was built with a different embedding model or
+                chunking configuration
+        """
+        state_path = Path(filepath).with_suffix('.pkl')
+        if not state_path.exists():
+            raise ValueError(f"Index at {filepath} has no sidecar state at {state_path}")
+        with open(state_path, 'rb') as f:
+            state = pickle.load(f)
+        if state.get('config') != self.config:
+            raise ValueError(
+                f"Index at {filepath} was built with {state.get('config')}, "
+                f"not {self.config}"
+            )
+        
+        index = faiss.read_index(filepath)
+        # Rows and chunks must line up one to one, or results point at the wrong text
+        if index.ntotal != len(state['chunk_texts']):
+            raise ValueError(
+                f"Index at {filepath} has {index.ntotal} vectors but its sidecar "
+                f"has {len(state['chunk_texts'])} chunks"
+            )
+        
+        self.index = index
+        self.chunk_texts = state['chunk_texts']
+        self.chunk_metadata = state['chunk_metadata']
+        self.documents = state['documents']
+        self.hash_to_row = state['hash_to_row']
+        self.file_fingerprints = state['file_fingerprints']
+
 
+    def _extract_pdf(self, file_path: Path) -> str:
+        """
+        Extract the text of a PDF, spreading large documents over the shared
+        extraction pool.
+        
+        Args:
+            file_path: Path to the PDF
+        """
+        futures = self._submit_pdf(file_path)
+        if futures is None:
+            return extract_pages(str(file_path), 0, pdf_page_count(str(file_path)))
+        return "".join(future.result() for future in futures)
 
     def _read_file(self, file_path: Union[str, Path]) -> str:
         """Read different file types and return text content"""
         file_path = Path(file_path)
-        text = ""
-        
-        if file_path.suffix == '.txt':
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text = f.read()
-                
-        elif file_path.suffix == '.md':
+        if file_path.suffix in ('.txt', '.md'):
             with open(file_path, 'r', encoding='utf-8') as f:
                 text = f.read()
-                
         elif file_path.suffix == '.pdf':
-            text = ""
-            with open(file_path, 'rb') as f:
-                reader = PyPDF2.PdfReader(f)
-                for page in reader.pages:
-                    text += page.extract_text()
-        
+            text = self._extract_pdf(file_path)
         else:
             raise ValueError(f"Unsupported file type: {file_path.suffix}")
-            
         return self._preprocess_text(text)
+    
+    def _submit_pdf(self, file_path: Union[str, Path]) -> Optional[List[Future]]:
+        """
+        Schedule extraction of a large PDF on the shared pool, one page range
+        per worker. Other files are cheaper to read in-process.
+        
+        Returns:
+            The futures whose joined results give the PDF's raw text, or None
+            if the file is not a PDF of at least PARALLEL_PDF_MIN_PAGES pages
+        """
+        if Path(file_path).suffix != '.pdf':
+            return None
+        num_pages = pdf_page_count(str(file_path))
+        if num_pages < PARALLEL_PDF_MIN_PAGES:
+            return None
+        # PDF handles aren't picklable, so each worker reopens the file for its own
+        # page range. PDFium is not thread-safe, hence processes rather than threads.
+        pool = extraction_pool()
+        return [
+            pool.submit(extract_pages, str(file_path), start, stop)
+            for start, stop in page_ranges(num_pages)
+        ]
 
     def _preprocess_text(self, text: str) -> str:
         """Basic text preprocessing"""
         # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _WS_RE.sub(' ', text).strip()
         # Remove special characters but keep important punctuation
-        text = re.sub(r'[^\w\s.,!?-]', ' ', text)
+        text = _SPECIAL_RE.sub(' ', text)
         # Ensure proper spacing around punctuation
-        text = re.sub(r'\s+([.,!?])', r'\1', text)
+        text = _PUNCT_RE.sub(r'\1', text)
         return text
 
     def add_file(self, file_path: Union[str, Path], metadata: dict = None):
-        """Add a single file to the retriever"""
+        """Add a single file to the retriever, replacing an earlier version of it"""
         if metadata is None:
             metadata = {}
         
+        stat = Path(file_path).stat()
         text = self._read_file(file_path)
         doc = {
             "text": text,
             **metadata,
             "source": str(file_path)
         }
-        self.add_documents([doc])
+        self._replace_sources({str(file_path)}, [doc])
+        self.file_fingerprints[str(file_path)] = (stat.st_mtime, stat.st_size)
+
+    def add_files(self, file_paths: List[Union[str, Path]]):
+        """
+        Add several files at once. All chunks from all files are embedded in a
+        single batched encode call rather than one call per file. Files that
+        changed since they were added replace their old chunks, and chunks of
+        previously added files that no longer exist are removed.
+        
+        Args:
+            file_paths: Paths of the files to add
+        """
+        docs = []
+        pending = []
+        fingerprints = {}
+        # Large PDFs go to the extraction pool up front so they are parsed
+        # while the remaining files are read here
+        for file_path in file_paths:
+            try:
+                # Skip files that are unchanged since they were ingested
+                stat = Path(file_path).stat()
+                fingerprint = (stat.st_mtime, stat.st_size)
+                if self.file_fingerprints.get(str(file_path)) == fingerprint:
+                    print(f"Unchanged, skipped: {file_path}")
+                    continue
+                pending.append((file_path, fingerprint, self._submit_pdf(file_path)))
+            except Exception as e:
+                print(f"Failed to process {file_path}: {str(e)}")
+        
+        # Collect results in submission order
+        for file_path, fingerprint, futures in pending:
+            try:
+                if futures is None:
+                    text = self._read_file(file_path)
+                else:
+                    text = self._preprocess_text("".join(future.result() for future in futures))
+                docs.append({
+                    "text": text,
+                    "source": str(file_path)
+                })
+                fingerprints[str(file_path)] = fingerprint
+                print(f"Processed: {file_path}")
+            except Exception as e:
+                print(f"Failed to process {file_path}: {str(e)}")
+        
+        # Earlier versions of the re-read files, and files deleted since, must go
+        vanished = {source for source in self.file_fingerprints if not Path(source).exists()}
+        for source in vanished:
+            print(f"Removed: {source}")
+        if docs or vanished:
+            self._replace_sources(set(fingerprints) | vanished, docs)
+        for source in vanished:
+            del self.file_fingerprints[source]
+        self.file_fingerprints.update(fingerprints)
+
+    def _replace_sources(self, sources: set, documents: List[Dict]):
+        """
+        Add documents after removing every chunk that came from the given
+        sources. FAISS graph indexes cannot delete rows, so when any source was
+        indexed before, the index is rebuilt from the remaining documents,
+        reusing their stored vectors instead of encoding them again.
+        
+        Args:
+            sources: Source paths whose earlier documents are dropped
+            documents: New documents to add
+        """
+        def source_of(doc):
+            return doc.get('source') if isinstance(doc, dict) else None
+        
+        if self.index is None or not any(source_of(doc) in sources for doc in self.documents):
+            self._add_documents(documents)
+            return
+        
+        # Rows only hold vectors that survived dedupe; every hash maps to one of them
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        known_embeddings = {chunk_hash: vectors[row] for chunk_hash, row in self.hash_to_row.items()}
+        remaining = [doc for doc in self.documents if source_of(doc) not in sources]
+        
+        self.index = None
+        self.chunk_texts = []
+        self.chunk_metadata = []
+        self.hash_to_row = {}
+        self.documents = []
+        self._add_documents(remaining + documents, known_embeddings=known_embeddings)
+
+    @staticmethod
+    def _list_directory(dir_path: Path, glob_pattern: str) -> List[Path]:
+        """Files in a directory matching a glob pattern"""
+        if '/' in glob_pattern or '**' in glob_pattern:
+            return [p for p in dir_path.glob(glob_pattern) if p.is_file()]
+        
+        # Flat patterns: one scandir pass, where is_file() uses the cached entry type
+        # instead of a stat call per file
+        with os.scandir(dir_path) as entries:
+            return [
+                dir_path / entry.name for entry in entries
+                if entry.is_file() and fnmatch.fnmatch(entry.name, glob_pattern)
+            ]
 
     def add_directory(self, dir_path: Union[str, Path], glob_pattern: str = "*"):
         """Add all matching files in a directory"""
+        self.add_files(self._list_directory(Path(dir_path), glob_pattern))
+
+    def load_or_build(self, dir_path: Union[str, Path], snapshot_dir: Union[str, Path],
+                      glob_pattern: str = "*") -> bool:
+        """
+        Index a directory, reusing a saved snapshot when neither the files nor
+        the retriever settings changed since it was written. A hit skips
+        reading, chunking and embedding entirely.
+        
+        Args:
+            dir_path: Directory to index
+            snapshot_dir: Directory holding snapshots, one per directory fingerprint
+            glob_pattern: Pattern for matching files in the directory
+            
+        Returns:
+            bool: True if the index was restored from a snapshot
+        """
         dir_path = Path(dir_path)
-        for file_path in dir_path.glob(glob_pattern):
-            if file_path.is_file():
-                try:
-                    self.add_file(file_path)
-                    print(f"Processed: {file_path}")
-                except Exception as e:
-                    print(f"Failed to process {file_path}: {str(e)}")
\ No newline at end of file
+        if self.index is not None:
+            # A snapshot would replace what is already indexed
+            self.add_directory(dir_path, glob_pattern)
+            return False
+        
+        files = self._list_directory(dir_path, glob_pattern)
+        stats = [(str(p.relative_to(dir_path)), p.stat()) for p in files]
+        digest = hashlib.sha256(repr((
+            self.config, self.index_type, self.store_fp16, self.dedupe_threshold
+        )).encode('utf-8'))
+        for relpath, st in sorted(stats, key=lambda item: item[0]):
+            digest.update(f"{relpath}\x00{st.st_mtime_ns}\x00{st.st_size}\n".encode('utf-8'))
+        snapshot_path = Path(snapshot_dir) / f"{digest.hexdigest()}.faiss"
+        
+        if snapshot_path.exists():
+            try:
+                self.load_index(str(snapshot_path))
+                print(f"Loaded index snapshot: {snapshot_path}")
+                return True
+            except ValueError as e:
+                print(f"Ignoring index snapshot: {str(e)}")
+        
+        self.add_files(files)
+        if self.index is not None:
+            snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            self.save_index(str(snapshot_path))
+        return False
\ No newline at end of file
@@ -0,0 +1,33 @@
+import os
+import shlex
+
+import pytest
+
+from helpers import project_root, get_components
+from utils.logger import RAGLogger
+
+def _dist_given(config) -> bool:
+    """Whether --dist was passed on the command line, in addopts or in PYTEST_ADDOPTS"""
+    args = list(config.invocation_params.args) + config.getini("addopts")
+    args += shlex.split(os.environ.get("PYTEST_ADDOPTS", ""))
+    return any(arg in ("--dist", "-d", "--distload") or arg.startswith("--dist=") for arg in args)
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Under pytest-xdist (-n), send each test module to a single worker so the
+    # session-scoped models load once per worker rather than on every worker.
+    # An explicit --dist choice is left alone
+    if getattr(config.option, "dist", "no") == "load" and not _dist_given(config):
+        config.option.dist = "loadscope"
+
+@pytest.fixture(scope="session")
+def setup_test_env():
+    """Set up test environment with retriever, generator, and logger"""
+    retriever, generator = get_components()
+    
+    # Initialize logger
+    log_dir = project_root / "logs"
+    logger = RAGLogger(log_dir)
+    
+    yield retriever, generator, logger
+    logger.close()
@@ -0,0 +1,34 @@
+import functools
+from pathlib import Path
+import sys
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+# Chunk embeddings and answered questions persisted between test runs
+EMBEDDING_CACHE_DIR = project_root / "logs" / ".emb_cache"
+QUERY_CACHE_PATH = project_root / "logs" / ".query_cache.pkl"
+INDEX_SNAPSHOT_DIR = project_root / "logs" / ".index_snapshots"
+
+@functools.lru_cache(maxsize=None)
+def get_components():
+    """Build the indexed retriever and generator once per process"""
+    # Imported here so suites that don't need the models collect without torch
+    from baseline.generator.generator import Generator
+    from baseline.retriever.retriever import Retriever
+    
+    # Initialize components with same parameters as direct usage
+    retriever = Retriever(
+        model_name='all-MiniLM-L6-v2',
+        chunk_size=512,
+        chunk_overlap=100,
+        embedding_cache_dir=EMBEDDING_CACHE_DIR
+    )
+    generator = Generator(retriever=retriever)
+    
+    # Add test data, restoring the index from a snapshot when data/ is unchanged
+    data_dir = project_root / "data"
+    retriever.load_or_build(data_dir, INDEX_SNAPSHOT_DIR)
+    
+    return retriever, generator
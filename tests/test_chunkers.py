@@ -0,0 +1,59 @@
+import random
+import re
+
+from utils.chunkers import TextChunker, split_sentences
+
+def _baseline_chunk_text(text, chunk_size=512, overlap=50):
+    """The original accumulator that chunk_text and chunk_stream must reproduce"""
+    if not text:
+        return []
+    sentences = re.split(r'(?<=[.!?])\s+', text)
+    chunks = []
+    current_chunk = []
+    current_len = 0
+    for sentence in sentences:
+        sentence_len = len(sentence)
+        if current_len + sentence_len > chunk_size and current_chunk:
+            chunks.append(' '.join(current_chunk))
+            current_chunk = current_chunk[-overlap:] if overlap else []
+            current_len = sum(len(s) for s in current_chunk)
+        current_chunk.append(sentence)
+        current_len += sentence_len
+    if current_chunk:
+        chunks.append(' '.join(current_chunk))
+    return chunks
+
+def _random_text(rng, length):
+    """Short words, sentence punctuation and whitespace runs"""
+    return ''.join(rng.choice("abcde   .!?\n\t") for _ in range(length))
+
+def _random_blocks(rng, text):
+    """Split text at random offsets, including empty blocks"""
+    cuts = sorted(rng.randint(0, len(text)) for _ in range(rng.randint(0, 8)))
+    return [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+
+def test_chunk_text_matches_baseline():
+    """chunk_text produces the original chunks for random texts and settings"""
+    rng = random.Random(0)
+    for _ in range(500):
+        text = _random_text(rng, rng.randint(0, 400))
+        chunk_size = rng.randint(1, 80)
+        overlap = rng.randint(0, 5)
+        assert TextChunker.chunk_text(text, chunk_size, overlap) == _baseline_chunk_text(text, chunk_size, overlap)
+
+def test_chunk_stream_matches_baseline():
+    """Streaming block-split text gives the same chunks as the whole string"""
+    rng = random.Random(1)
+    for _ in range(500):
+        text = _random_text(rng, rng.randint(0, 400))
+        chunk_size = rng.randint(1, 80)
+        overlap = rng.randint(0, 5)
+        sentences = split_sentences(_random_blocks(rng, text))
+        assert list(TextChunker.chunk_stream(sentences, chunk_size, overlap)) == _baseline_chunk_text(text, chunk_size, overlap)
+
+def test_split_sentences_caps_carry():
+    """Text without sentence boundaries is yielded once it exceeds max_carry"""
+    blocks = ["word " * 20] * 50
+    sentences = list(split_sentences(blocks, max_carry=300))
+    assert max(len(s) for s in sentences) <= 300 + len(blocks[0])
+    assert ''.join(sentences).replace(' ', '') == ''.join(blocks).replace(' ', '')
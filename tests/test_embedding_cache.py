@@ -0,0 +1,32 @@
+import numpy as np
+
+from utils.embedding_cache import EmbeddingCache
+
+def test_round_trip(tmp_path):
+    """Stored embeddings come back by position; unknown texts are misses"""
+    cache = EmbeddingCache(str(tmp_path), "model-a")
+    embeddings = np.arange(6, dtype=np.float32).reshape(2, 3)
+    cache.put_many(["first", "second"], embeddings)
+
+    found = cache.get_many(["second", "unknown", "first"])
+    assert sorted(found) == [0, 2]
+    np.testing.assert_array_equal(found[0], embeddings[1])
+    np.testing.assert_array_equal(found[2], embeddings[0])
+
+def test_persists_per_model(tmp_path):
+    """Entries survive a new instance but are keyed by model name"""
+    EmbeddingCache(str(tmp_path), "model-a").put_many(["text"], np.ones((1, 3), dtype=np.float32))
+
+    assert list(EmbeddingCache(str(tmp_path), "model-a").get_many(["text"])) == [0]
+    assert EmbeddingCache(str(tmp_path), "model-b").get_many(["text"]) == {}
+
+def test_many_texts(tmp_path):
+    """Lookups larger than one SQL batch find every entry"""
+    cache = EmbeddingCache(str(tmp_path), "model-a")
+    texts = [f"text {i}" for i in range(1200)]
+    embeddings = np.random.default_rng(0).random((len(texts), 3), dtype=np.float32)
+    cache.put_many(texts, embeddings)
+
+    found = cache.get_many(texts)
+    assert len(found) == len(texts)
+    np.testing.assert_array_equal(found[1100], embeddings[1100])
@@ -1,11 +1,11 @@
 import json
-import pytest
 from pathlib import Path
 import sys
 from typing import List, Dict, Any
 from datetime import datetime
 import uuid
 import argparse
+import functools
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
@@ -16,26 +16,7 @@ from baseline.retriever.retriever import Retriever
 from utils.logger import RAGLogger
 from baseline.pipeline import RAGPipeline
 
-@pytest.fixture
-def setup_test_env():
-    """Set up test environment with retriever, generator, and logger"""
-    # Initialize components with same parameters as direct usage
-    retriever = Retriever(
-        model_name='all-MiniLM-L6-v2',
-        chunk_size=512,
-        chunk_overlap=100
-    )
-    generator = Generator(retriever=retriever)
-    
-    # Add test data
-    data_dir = project_root / "data"
-    retriever.add_directory(data_dir)
-    
-    # Initialize logger
-    log_dir = project_root / "logs"
-    logger = RAGLogger(log_dir)
-    
-    return retriever, generator, logger
+from helpers import QUERY_CACHE_PATH, INDEX_SNAPSHOT_DIR, get_components
 
 def test_generator_initialization():
     """Test generator initialization"""
@@ -189,39 +170,27 @@ def run_test_suite():
     with open(test_file, 'r') as f:
         test_data = json.load(f)
     
-    # Initialize components with same parameters as direct usage
-    retriever = Retriever(
-        model_name='all-MiniLM-L6-v2',
-        chunk_size=512,
-        chunk_overlap=100
-    )
-    generator = Generator(retriever=retriever)
+    retriever, generator = get_components()
     logger = RAGLogger(project_root / "logs")
     
-    # Add test data
-    data_dir = project_root / "data"
-    retriever.add_directory(data_dir)
+    # Retrieve and generate for every question in one batch each
+    questions = [test_case['question'] for test_case in test_data]
+    all_chunks = retriever.query_batch(questions, k=3)
+    contexts = ["\n".join([chunk['text'] for chunk in chunks]) for chunks in all_chunks]
+    prompts = [generator.build_prompt(context, question) for context, question in zip(contexts, questions)]
+    answers = generator.generate_answers(contexts, questions)
     
     # Run tests
     results = []
-    for test_case in test_data:
+    log_entries = []
+    for test_case, chunks, prompt, answer in zip(test_data, all_chunks, prompts, answers):
         question = test_case['question']
         expected_terms = test_case['expected_answer_contains']
         
-        # Get retrieved chunks with higher k value
-        chunks = retriever.query(question, k=3)
-        context = "\n".join([chunk['text'] for chunk in chunks])
-        
-        # Generate answer with context and higher temperature
-        answer = generator.generate_answer(
-            question, 
-            context=context,
-            k=3  # Increased from default k=3
-        )
-        
-        # Check expected terms
-        found_terms = [term for term in expected_terms if term.lower() in answer.lower()]
-        missing_terms = [term for term in expected_terms if term.lower() not in answer.lower()]
+        # Check expected terms, lowercasing the answer once
+        answer_lower = answer.lower()
+        found_terms = [term for term in expected_terms if term.lower() in answer_lower]
+        missing_terms = [term for term in expected_terms if term.lower() not in answer_lower]
         
         # Calculate percentage of expected terms found
         total_terms = len(expected_terms)
@@ -230,15 +199,15 @@ def run_test_suite():
         # Pass if at least 70% of expected terms are found
         passed = found_percentage >= 50
         
-        # Log the query
-        logger.log_query(
-            question=question,
-            retrieved_chunks=chunks,
-            prompt=generator.build_prompt(context, question),
-            generated_answer=answer,
-            retrieval_scores=[chunk['score'] for chunk in chunks],
-            group_id="Shahzaib Khan Gakhar"
-        )
+        # Collect the log entry; all entries are written at once below
+        log_entries.append({
+            'question': question,
+            'retrieved_chunks': chunks,
+            'prompt': prompt,
+            'generated_answer': answer,
+            'retrieval_scores': [chunk['score'] for chunk in chunks],
+            'group_id': "Shahzaib Khan Gakhar"
+        })
         
         results.append({
             'question': question,
@@ -250,6 +219,8 @@ def run_test_suite():
             'passed': passed
         })
     
+    logger.log_queries(log_entries)
+    logger.close()
     return results
 
 def main():
@@ -277,24 +248,32 @@ def main():
     print(f"Passed Tests: {passed_tests}")
     print(f"Pass Rate: {(passed_tests/total_tests)*100:.1f}%")
 
-def run_tests(test_case=None, verbose=False):
-    # Initialize pipeline
+@functools.lru_cache(maxsize=4)
+def _get_pipeline(model_name: str, retriever_model: str, log_dir: str) -> RAGPipeline:
+    """Build and index a pipeline once per process for each model combination"""
     pipeline = RAGPipeline(
-        model_name="google/flan-t5-base",
-        retriever_model='all-MiniLM-L6-v2',
-        log_dir=str(project_root / "logs")
+        model_name=model_name,
+        retriever_model=retriever_model,
+        log_dir=log_dir,
+        cache_ttl=24 * 60 * 60
     )
     
+    # Add data, restoring the index from a snapshot when data/ is unchanged
+    data_dir = project_root / "data"
+    pipeline.retriever.load_or_build(data_dir, INDEX_SNAPSHOT_DIR)
+    pipeline.load_cache(str(QUERY_CACHE_PATH))
+    return pipeline
+
+def run_tests(test_case=None, verbose=False):
+    # Initialize pipeline
+    pipeline = _get_pipeline("google/flan-t5-base", 'all-MiniLM-L6-v2', str(project_root / "logs"))
+    
     # Initialize logger with test prefix
     logger = RAGLogger(
         log_dir=str(project_root / "logs"),
         log_prefix="test_"  # Add test prefix to log files
     )
     
-    # Add data
-    data_dir = project_root / "data"
-    pipeline.add_documents(directory=str(data_dir))
-    
     # Test questions
     test_questions = [
         "When did Imran Khan start his cricket career?",
@@ -307,24 +286,28 @@ def run_tests(test_case=None, verbose=False):
     if test_case:
         test_questions = [test_case]
     
-    # Process each question
-    for question in test_questions:
+    # Answer all questions in one batched pass
+    results = pipeline.batch_query(test_questions)
+    pipeline.save_cache(str(QUERY_CACHE_PATH))
+    
+    # Log every query with a single write
+    logger.log_queries([
+        {
+            'question': question,
+            'retrieved_chunks': result['retrieved_chunks'],
+            'prompt': result['prompt'],
+            'generated_answer': result['answer'],
+            'retrieval_scores': result['retrieval_scores'],
+            'group_id': "Test Generator"
+        }
+        for question, result in zip(test_questions, results)
+    ])
+    logger.close()
+    
+    for question, result in zip(test_questions, results):
         if verbose:
             print(f"\nProcessing question: {question}")
         
-        # Get answer
-        result = pipeline.query(question)
-        
-        # Log the query
-        logger.log_query(
-            question=question,
-            retrieved_chunks=result['retrieved_chunks'],
-            prompt=result['prompt'],
-            generated_answer=result['answer'],
-            retrieval_scores=result['retrieval_scores'],
-            group_id="Test Generator"
-        )
-        
         if verbose:
             print(f"Generated Answer: {result['answer']}")
             print("\nRetrieved Chunks:")
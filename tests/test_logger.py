@@ -0,0 +1,77 @@
+import time
+
+import utils.logger as logger_module
+from utils.logger import RAGLogger
+
+def _log(logger, count, start=0):
+    for i in range(start, start + count):
+        logger.log_query(f"question {i}", ["chunk"], "prompt", "answer", group_id="tests")
+
+def test_entries_are_buffered_until_flush(tmp_path):
+    """A few entries stay in memory until flushed"""
+    logger = RAGLogger(tmp_path)
+    _log(logger, 3)
+    log_file = logger._get_log_file()
+    assert log_file.stat().st_size == 0
+
+    logger.flush()
+    assert len(log_file.read_bytes().splitlines()) == 3
+    logger.close()
+
+def test_flush_after_line_count(tmp_path):
+    """Entries are written once FLUSH_LINES of them are pending"""
+    logger = RAGLogger(tmp_path)
+    _log(logger, logger_module.FLUSH_LINES)
+
+    assert len(logger._get_log_file().read_bytes().splitlines()) == logger_module.FLUSH_LINES
+    logger.close()
+
+def test_flush_after_interval(tmp_path, monkeypatch):
+    """Pending entries are written by a timer without further calls"""
+    monkeypatch.setattr(logger_module, "FLUSH_INTERVAL", 0.01)
+    logger = RAGLogger(tmp_path)
+    _log(logger, 1)
+    log_file = logger._get_log_file()
+
+    deadline = time.monotonic() + 5
+    while log_file.stat().st_size == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(log_file.read_bytes().splitlines()) == 1
+    logger.close()
+
+def test_close_writes_pending_entries(tmp_path):
+    """Closing flushes, and a closed logger can be closed again"""
+    logger = RAGLogger(tmp_path)
+    _log(logger, 2)
+    logger.close()
+    logger.close()
+
+    assert len(logger._get_log_file().read_bytes().splitlines()) == 2
+
+def test_recent_logs_across_blocks(tmp_path, monkeypatch):
+    """The reverse tail read returns the last n entries in order"""
+    monkeypatch.setattr(logger_module, "TAIL_BLOCK_SIZE", 64)
+    logger = RAGLogger(tmp_path)
+    _log(logger, 50)
+
+    recent = logger.get_recent_logs(7)
+    assert [entry["question"] for entry in recent] == [f"question {i}" for i in range(43, 50)]
+    assert len(logger.get_recent_logs(100)) == 50
+    assert logger.get_recent_logs(0) == []
+    logger.close()
+
+def test_log_queries(tmp_path):
+    """Batched entries are written at once, with given and generated fields"""
+    logger = RAGLogger(tmp_path, log_prefix="test_")
+    logger.log_queries([
+        {'question': "q1", 'retrieved_chunks': [], 'prompt': "p", 'generated_answer': "a1"},
+        {'question': "q2", 'retrieved_chunks': [], 'prompt': "p", 'generated_answer': "a2", 'group_id': "g"}
+    ])
+
+    log_file = logger._get_log_file()
+    assert log_file.name.startswith("test_rag_logs_")
+    entries = logger.get_recent_logs(2)
+    assert [entry["generated_answer"] for entry in entries] == ["a1", "a2"]
+    assert entries[1]["group_id"] == "g"
+    assert entries[0]["group_id"] and entries[0]["timestamp"]
+    logger.close()
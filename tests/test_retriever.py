@@ -1,6 +1,13 @@
 import pytest
+import baseline.retriever.retriever as retriever_module
 from baseline.retriever.retriever import Retriever
+import hashlib
 import os
+import zlib
+
+import numpy as np
+
+from helpers import EMBEDDING_CACHE_DIR
 
 # Test file path - adjust as needed
 TEST_PDF_PATH = "../data/ImranKhan.pdf"
@@ -12,7 +19,8 @@ def test_pdf_retrieval_with_expected_results():
     retriever = Retriever(
         model_name='all-MiniLM-L6-v2',
         chunk_size=500,
-        chunk_overlap=50
+        chunk_overlap=50,
+        embedding_cache_dir=EMBEDDING_CACHE_DIR
     )
     
     # 2. Add the PDF file
@@ -44,12 +52,12 @@ def test_pdf_retrieval_with_expected_results():
         "Waqar Younis"
     ]
     
+    # Case-fold the phrases once and each result text once
+    folded_phrases = [phrase.casefold() for phrase in expected_phrases]
     found_phrases = 0
     for result in results:
-        text = result['text']
-        for phrase in expected_phrases:
-            if phrase.lower() in text.lower():
-                found_phrases += 1
+        text = result['text'].casefold()
+        found_phrases += sum(phrase in text for phrase in folded_phrases)
     
     assert found_phrases >= 2, f"Expected at least 2 cricket terms in results, found {found_phrases}"
     
@@ -59,4 +67,112 @@ def test_pdf_retrieval_with_expected_results():
         assert 'score' in result
         assert 'metadata' in result
         assert isinstance(result['metadata'], dict)
-        assert TEST_PDF_PATH in result['metadata'].get('source', '')
\ No newline at end of file
+        assert TEST_PDF_PATH in result['metadata'].get('source', '')
+
+
+class _StubEncoder:
+    """Stands in for SentenceTransformer: texts sharing a first word embed identically"""
+    dim = 16
+    
+    def __init__(self, model_name, device=None):
+        self.encoded = 0
+        
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+    
+    def encode(self, texts, **kwargs):
+        self.encoded += len(texts)
+        embeddings = np.array([
+            np.random.default_rng(zlib.crc32(text.split()[0].encode())).standard_normal(self.dim)
+            for text in texts
+        ], dtype=np.float32)
+        return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+def _stub_retriever(monkeypatch, **kwargs):
+    monkeypatch.setattr(retriever_module, "SentenceTransformer", _StubEncoder)
+    return Retriever(model_name='stub', **kwargs)
+
+def test_dedupe_maps_duplicates_to_kept_rows(monkeypatch):
+    """Near-duplicates are not indexed and point at the row of their original"""
+    retriever = _stub_retriever(monkeypatch, index_type='flat')
+    retriever.add_documents(["alpha one", "beta one"])
+    retriever.add_documents(["alpha two", "gamma one", "gamma two", "beta two", "delta one"])
+    
+    assert retriever.chunk_texts == ["alpha one", "beta one", "gamma one", "delta one"]
+    assert retriever.index.ntotal == 4
+    rows = {
+        text: retriever.hash_to_row[hashlib.sha256(text.encode('utf-8')).digest()]
+        for text in ["alpha two", "beta two", "gamma two", "delta one"]
+    }
+    assert rows == {"alpha two": 0, "beta two": 1, "gamma two": 2, "delta one": 3}
+
+def test_dedupe_rows_matches_sequential_rule(monkeypatch):
+    """Blocked dedupe gives the same rows as checking chunks one at a time"""
+    monkeypatch.setattr(retriever_module, "DEDUPE_BLOCK_SIZE", 7)
+    retriever = _stub_retriever(monkeypatch, index_type='flat', dedupe_threshold=0.9)
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((10, _StubEncoder.dim))
+    
+    def clustered(count):
+        points = centers[rng.integers(0, len(centers), count)] + 0.15 * rng.standard_normal((count, _StubEncoder.dim))
+        return (points / np.linalg.norm(points, axis=1, keepdims=True)).astype(np.float32)
+    
+    indexed = clustered(5)
+    retriever.index = retriever._create_index()
+    retriever.index.add(indexed)
+    embeddings = clustered(60)
+    
+    expected = []
+    kept = []
+    for embedding in embeddings:
+        existing = indexed @ embedding
+        earlier = np.array([embeddings[i] @ embedding for i in kept])
+        if existing.max() > 0.9:
+            expected.append(int(existing.argmax()))
+        elif len(earlier) and earlier.max() > 0.9:
+            expected.append(~int(earlier.argmax()))
+        else:
+            expected.append(None)
+            kept.append(len(expected) - 1)
+    
+    assert retriever._dedupe_rows(embeddings) == expected
+
+def test_load_or_build_reuses_snapshot(monkeypatch, tmp_path):
+    """An unchanged directory loads its snapshot; a changed one is rebuilt"""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "a.txt").write_text("alpha text.", encoding='utf-8')
+    (data_dir / "b.txt").write_text("beta text.", encoding='utf-8')
+    snapshot_dir = tmp_path / "snapshots"
+    
+    retriever = _stub_retriever(monkeypatch, index_type='flat')
+    assert not retriever.load_or_build(data_dir, snapshot_dir)
+    assert len(list(snapshot_dir.glob("*.faiss"))) == 1
+    
+    restored = _stub_retriever(monkeypatch, index_type='flat')
+    assert restored.load_or_build(data_dir, snapshot_dir)
+    assert restored.model.encoded == 0
+    assert restored.chunk_texts == retriever.chunk_texts
+    
+    (data_dir / "b.txt").write_text("gamma text, edited.", encoding='utf-8')
+    rebuilt = _stub_retriever(monkeypatch, index_type='flat')
+    assert not rebuilt.load_or_build(data_dir, snapshot_dir)
+    assert sorted(rebuilt.chunk_texts) == ["alpha text.", "gamma text, edited."]
+
+def test_save_index_with_every_source_deleted(monkeypatch, tmp_path):
+    """Deleting every source removes the saved index instead of leaving it to be restored"""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "a.txt").write_text("alpha text.", encoding='utf-8')
+    index_path = tmp_path / "index.faiss"
+    
+    retriever = _stub_retriever(monkeypatch, index_type='flat')
+    retriever.add_directory(data_dir)
+    retriever.save_index(str(index_path))
+    assert index_path.exists() and index_path.with_suffix('.pkl').exists()
+    
+    (data_dir / "a.txt").unlink()
+    retriever.add_directory(data_dir)
+    retriever.save_index(str(index_path))
+    assert retriever.chunk_texts == []
+    assert not index_path.exists() and not index_path.with_suffix('.pkl').exists()
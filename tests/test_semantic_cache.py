@@ -0,0 +1,73 @@
+import numpy as np
+
+import utils.semantic_cache as semantic_cache
+from utils.semantic_cache import SemanticCache
+
+def _unit(*values):
+    """A normalized (1, dim) float32 query embedding"""
+    vector = np.array([values], dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+def test_hit_requires_threshold():
+    """Similar queries hit; dissimilar ones miss"""
+    cache = SemanticCache(4, threshold=0.95)
+    cache.put(_unit(1, 0, 0, 0), "answer")
+
+    assert cache.get(_unit(1, 0.1, 0, 0)) == "answer"
+    assert cache.get(_unit(1, 1, 0, 0)) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_tag_must_match():
+    """Entries for another k neither hit nor hide the matching entry"""
+    cache = SemanticCache(4)
+    cache.put(_unit(1, 0, 0, 0), "k3", tag=3)
+    cache.put(_unit(1, 0.01, 0, 0), "k5", tag=5)
+
+    assert cache.get(_unit(1, 0, 0, 0), tag=3) == "k3"
+    assert cache.get(_unit(1, 0, 0, 0), tag=5) == "k5"
+    assert cache.get(_unit(1, 0, 0, 0), tag=10) is None
+
+def test_entries_expire(monkeypatch):
+    """Entries older than the TTL are evicted on lookup"""
+    now = [1000.0]
+    monkeypatch.setattr(semantic_cache.time, "time", lambda: now[0])
+    cache = SemanticCache(4, ttl=10.0)
+    cache.put(_unit(1, 0, 0, 0), "answer")
+
+    now[0] += 5
+    assert cache.get(_unit(1, 0, 0, 0)) == "answer"
+    now[0] += 10
+    assert cache.get(_unit(1, 0, 0, 0)) is None
+    assert len(cache.entries) == 0
+
+def test_least_recently_used_is_evicted():
+    """A full cache evicts the entry looked up least recently"""
+    cache = SemanticCache(4, max_entries=2)
+    cache.put(_unit(1, 0, 0, 0), "a")
+    cache.put(_unit(0, 1, 0, 0), "b")
+    cache.get(_unit(1, 0, 0, 0))
+    cache.put(_unit(0, 0, 1, 0), "c")
+
+    assert cache.get(_unit(1, 0, 0, 0)) == "a"
+    assert cache.get(_unit(0, 1, 0, 0)) is None
+    assert cache.get(_unit(0, 0, 1, 0)) == "c"
+
+def test_save_and_load(tmp_path):
+    """A saved cache loads only under the same key"""
+    path = tmp_path / "cache.pkl"
+    cache = SemanticCache(4)
+    cache.put(_unit(1, 0, 0, 0), "answer", tag=3)
+    cache.save(str(path), key="v1")
+
+    assert not SemanticCache(4).load(str(path), key="v2")
+    restored = SemanticCache(4)
+    assert restored.load(str(path), key="v1")
+    assert restored.get(_unit(1, 0, 0, 0), tag=3) == "answer"
+
+def test_clear():
+    """Clearing drops every entry"""
+    cache = SemanticCache(4)
+    cache.put(_unit(1, 0, 0, 0), "answer")
+    cache.clear()
+
+    assert cache.get(_unit(1, 0, 0, 0)) is None
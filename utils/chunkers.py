@@ -1,6 +1,10 @@
-from typing import List
+from typing import Iterable, Iterator, List
 import re
 
+import numpy as np
+
+_SENT_RE = re.compile(r'(?<=[.!?])\s+')
+
 class TextChunker:
     @staticmethod
     def chunk_text(text: str, chunk_size: int = 512, overlap: int = 50) -> List[str]:
@@ -9,21 +13,88 @@ class TextChunker:
             return []
             
         # Split at sentence boundaries when possible
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        sentences = _SENT_RE.split(text)
+        num_sentences = len(sentences)
+        
+        # offsets[j] is the length of sentences[:j]; a chunk starting at `start`
+        # extends to the last sentence that keeps it within chunk_size
+        offsets = np.zeros(num_sentences + 1, dtype=np.int64)
+        np.cumsum(np.fromiter((len(s) for s in sentences), dtype=np.int64, count=num_sentences), out=offsets[1:])
+        
         chunks = []
+        start = 0
+        # First sentence not carried over from the previous chunk; always included
+        first = 0
+        while True:
+            end = int(np.searchsorted(offsets, offsets[start] + chunk_size, side='right')) - 1
+            end = min(max(end, first + 1), num_sentences)
+            chunks.append(' '.join(sentences[start:end]))
+            if end == num_sentences:
+                break
+            
+            # Carry the last `overlap` sentences into the next chunk
+            carried = min(overlap, end - start) if overlap else 0
+            start = end - carried
+            first = end
+            
+        return chunks
+    
+    @staticmethod
+    def chunk_stream(sentences: Iterable[str], chunk_size: int = 512, overlap: int = 50) -> Iterator[str]:
+        """
+        Lazily chunk a stream of sentences, e.g. from `iter_sentences`.
+        Produces the same chunks as `chunk_text` on the joined text while
+        only holding one chunk's sentences in memory.
+        """
         current_chunk = []
+        current_lens = []
         current_len = 0
         
         for sentence in sentences:
             sentence_len = len(sentence)
             if current_len + sentence_len > chunk_size and current_chunk:
-                chunks.append(' '.join(current_chunk))
-                current_chunk = current_chunk[-overlap:] if overlap else []
-                current_len = sum(len(s) for s in current_chunk)
+                yield ' '.join(current_chunk)
+                # Subtract only the dropped sentences so each length is counted out once
+                dropped = len(current_chunk) - min(overlap, len(current_chunk)) if overlap else len(current_chunk)
+                current_len -= sum(current_lens[:dropped])
+                current_chunk = current_chunk[dropped:]
+                current_lens = current_lens[dropped:]
             current_chunk.append(sentence)
+            current_lens.append(sentence_len)
             current_len += sentence_len
         
         if current_chunk:
-            chunks.append(' '.join(current_chunk))
-            
-        return chunks
\ No newline at end of file
+            yield ' '.join(current_chunk)
+
+def split_sentences(blocks: Iterable[str], max_carry: int = 1 << 16) -> Iterator[str]:
+    """
+    Split text arriving in blocks at sentence boundaries, as `chunk_text`
+    does for a whole string. Text after the last boundary seen so far is
+    carried into the next block, whitespace included, so boundaries that
+    straddle blocks split exactly as they would in the joined text.
+    
+    A carried sentence longer than `max_carry` characters (e.g. text with
+    no punctuation) is yielded as is rather than held until a boundary.
+    """
+    carry = ""
+    # Length of the carried sentence, before its trailing whitespace; no
+    # boundary can end inside it, so each block is scanned only from there
+    scanned = 0
+    for block in blocks:
+        text = carry + block
+        # Separators ending inside a trailing whitespace run may continue in the next block
+        end = len(text.rstrip())
+        start = 0
+        for match in _SENT_RE.finditer(text, scanned, end):
+            yield text[start:match.start()]
+            start = match.end()
+        
+        if end - start > max_carry:
+            yield text[start:end]
+            carry = ""
+            scanned = 0
+        else:
+            carry = text[start:]
+            scanned = end - start
+    if carry:
+        yield from _SENT_RE.split(carry)
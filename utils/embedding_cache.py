@@ -0,0 +1,70 @@
+from pathlib import Path
+from typing import Dict, List
+import hashlib
+import sqlite3
+
+import numpy as np
+
+class EmbeddingCache:
+    def __init__(self, cache_dir: str, model_name: str):
+        """
+        Persistent cache of text embeddings keyed by a hash of the model name and
+        the text, so unchanged text is never embedded twice across runs.
+        
+        Args:
+            cache_dir (str): Directory holding the SQLite cache file
+            model_name (str): Identifies the embedding model; part of every key
+        """
+        self.model_name = model_name
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        self.db_path = Path(cache_dir) / "embeddings.sqlite"
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+            
+    def _connect(self) -> sqlite3.Connection:
+        # A connection per call keeps the cache safe to use from worker threads
+        return sqlite3.connect(self.db_path)
+    
+    def _key(self, text: str) -> bytes:
+        return hashlib.sha256((self.model_name + "\x00" + text).encode('utf-8')).digest()
+    
+    def get_many(self, texts: List[str]) -> Dict[int, np.ndarray]:
+        """
+        Look up cached embeddings.
+        
+        Args:
+            texts (List[str]): Texts to look up
+            
+        Returns:
+            Dict[int, np.ndarray]: Position in `texts` -> float32 embedding, for hits only
+        """
+        keys = [self._key(text) for text in texts]
+        found = {}
+        with self._connect() as conn:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                    batch
+                )
+                found.update(rows)
+        return {
+            i: np.frombuffer(found[key], dtype=np.float32)
+            for i, key in enumerate(keys) if key in found
+        }
+    
+    def put_many(self, texts: List[str], embeddings: np.ndarray) -> None:
+        """
+        Store embeddings for texts.
+        
+        Args:
+            texts (List[str]): Embedded texts
+            embeddings (np.ndarray): Row-aligned float32 embeddings
+        """
+        rows = [
+            (self._key(text), np.asarray(embedding, dtype=np.float32).tobytes())
+            for text, embedding in zip(texts, embeddings)
+        ]
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
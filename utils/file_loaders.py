@@ -1,6 +1,50 @@
 import pdfplumber
 import docx
 from pathlib import Path
+import codecs
+import mmap
+
+# PDFium (C++) extracts page text far faster than pdfplumber; optional
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+def _extract_pdf(path):
+    """Extract text from every page of a PDF."""
+    if pdfium is not None:
+        pdf = pdfium.PdfDocument(str(path))
+        try:
+            return '\n'.join(page.get_textpage().get_text_range() for page in pdf)
+        finally:
+            pdf.close()
+    with pdfplumber.open(path) as pdf:
+        return '\n'.join(page.extract_text() or '' for page in pdf.pages)
+
+def stream_document(path, block_size=1 << 20):
+    """
+    Yield the text of a .txt or .md file in blocks decoded from a read-only
+    memory map, so memory use stays flat regardless of file size. Pair with
+    `utils.chunkers.split_sentences` and `TextChunker.chunk_stream`.
+    
+    Args:
+        path: File to read
+        block_size: Bytes decoded per block
+    """
+    path = Path(path)
+    if path.suffix not in ('.txt', '.md'):
+        raise ValueError(f"Unsupported file type for streaming: {path.suffix}")
+    
+    with open(path, 'rb') as f:
+        # mmap cannot map an empty file
+        if path.stat().st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # The incremental decoder holds back multi-byte characters split across blocks
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            for start in range(0, len(mm), block_size):
+                yield decoder.decode(mm[start:start + block_size])
+            yield decoder.decode(b'', final=True)
 
 def load_document(path):
     """Load text from various file formats."""
@@ -9,8 +53,7 @@ def load_document(path):
         with open(path) as f:
             return f.read()
     elif path.suffix == '.pdf':
-        with pdfplumber.open(path) as pdf:
-            return '\n'.join(page.extract_text() for page in pdf.pages)
+        return _extract_pdf(path)
     elif path.suffix == '.md':
         with open(path) as f:
             return f.read()
@@ -18,4 +61,4 @@ def load_document(path):
         doc = docx.Document(path)
         return '\n'.join(para.text for para in doc.paragraphs)
     else:
-        raise ValueError(f"Unsupported file type: {path.suffix}")
\ No newline at end of file
+        raise ValueError(f"Unsupported file type: {path.suffix}")
@@ -1,9 +1,80 @@
-import json
-from datetime import datetime
+import threading
+import weakref
+from datetime import date, datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import uuid
 
+import orjson
+
+# Pending entries are written out once they exceed this size or line count,
+# and at the latest this many seconds after the first of them was logged
+FLUSH_THRESHOLD = 1 << 16
+FLUSH_LINES = 32
+FLUSH_INTERVAL = 1.0
+
+# Block size used when reading a log file backwards
+TAIL_BLOCK_SIZE = 1 << 16
+
+class _LogWriter:
+    """
+    Buffered appender behind RAGLogger. It is a separate object so that the
+    flush timer and the finalizer can hold it without keeping the logger alive.
+    Entries are buffered as whole lines so concurrent writers to the same file
+    never interleave partial lines.
+    """
+    def __init__(self):
+        self._fh = None
+        self._fh_date = None
+        self._pending: List[bytes] = []
+        self._pending_bytes = 0
+        self._timer = None
+        self._lock = threading.Lock()
+        
+    def append(self, lines: List[bytes], log_file: Path, today: date, flush: bool = False) -> None:
+        """Buffer encoded lines for today's log file, reopening it when the date changes"""
+        with self._lock:
+            if today != self._fh_date:
+                self._flush_locked()
+                if self._fh is not None:
+                    self._fh.close()
+                self._fh = open(log_file, 'ab', buffering=0)
+                self._fh_date = today
+            
+            self._pending.extend(lines)
+            self._pending_bytes += sum(len(line) for line in lines)
+            if flush or self._pending_bytes >= FLUSH_THRESHOLD or len(self._pending) >= FLUSH_LINES:
+                self._flush_locked()
+            elif self._timer is None:
+                # Bound how long an entry can sit in memory if the process dies
+                self._timer = threading.Timer(FLUSH_INTERVAL, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+                
+    def _flush_locked(self) -> None:
+        """Write out pending entries with a single write; caller holds the lock"""
+        if self._pending and self._fh is not None:
+            self._fh.write(b"".join(self._pending))
+        self._pending = []
+        self._pending_bytes = 0
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+    def flush(self) -> None:
+        """Write any buffered entries to the log file"""
+        with self._lock:
+            self._flush_locked()
+            
+    def close(self) -> None:
+        """Flush buffered entries and close the log file"""
+        with self._lock:
+            self._flush_locked()
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+                self._fh_date = None
+
 class RAGLogger:
     def __init__(self, log_dir: str = "logs", log_prefix: str = ""):
         """
@@ -17,10 +88,22 @@ class RAGLogger:
         self.log_prefix = log_prefix
         self.log_dir.mkdir(parents=True, exist_ok=True)
         
+        self._cached_date = None
+        self._cached_path = None
+        
+        # Keeps today's log file open; flushed and closed when the logger is
+        # garbage collected or at interpreter exit, whichever comes first
+        self._writer = _LogWriter()
+        self._finalizer = weakref.finalize(self, self._writer.close)
+        
     def _get_log_file(self):
         """Get the current log file path with prefix"""
-        timestamp = datetime.now().strftime("%Y%m%d")
-        return self.log_dir / f"{self.log_prefix}rag_logs_{timestamp}.jsonl"
+        # The path only changes at midnight, so format it once per day
+        today = date.today()
+        if today != self._cached_date:
+            self._cached_path = self.log_dir / f"{self.log_prefix}rag_logs_{today:%Y%m%d}.jsonl"
+            self._cached_date = today
+        return self._cached_path
         
     def log_query(self, 
                  question: str,
@@ -42,20 +125,61 @@ class RAGLogger:
             retrieval_scores (List[float], optional): Scores for retrieved chunks
             chunk_ids (List[str], optional): IDs of retrieved chunks
         """
+        self._append([self._encode_entry(
+            question=question,
+            retrieved_chunks=retrieved_chunks,
+            prompt=prompt,
+            generated_answer=generated_answer,
+            group_id=group_id,
+            retrieval_scores=retrieval_scores,
+            chunk_ids=chunk_ids
+        )])
+        
+    def log_queries(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Log several RAG queries at once with a single file write.
+        
+        Args:
+            entries (List[Dict[str, Any]]): One dict per query, holding the
+                keyword arguments accepted by `log_query`
+        """
+        self._append([self._encode_entry(**entry) for entry in entries], flush=True)
+        
+    @staticmethod
+    def _encode_entry(question: str,
+                      retrieved_chunks: List[str],
+                      prompt: str,
+                      generated_answer: str,
+                      group_id: Optional[str] = None,
+                      retrieval_scores: Optional[List[float]] = None,
+                      chunk_ids: Optional[List[str]] = None) -> bytes:
+        """Serialize one log entry as a JSON line"""
         log_entry = {
             "question": question,
             "retrieved_chunks": retrieved_chunks,
             "prompt": prompt,
             "generated_answer": generated_answer,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now(),
             "group_id": group_id or str(uuid.uuid4()),
             "retrieval_scores": retrieval_scores,
             "chunk_ids": chunk_ids
         }
         
+        # orjson writes datetimes as ISO 8601, matching the old isoformat() output
+        return orjson.dumps(log_entry, option=orjson.OPT_APPEND_NEWLINE)
+        
+    def _append(self, lines: List[bytes], flush: bool = False) -> None:
+        """Buffer encoded lines for today's log file"""
         log_file = self._get_log_file()
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        self._writer.append(lines, log_file, self._cached_date, flush=flush)
+        
+    def flush(self) -> None:
+        """Write any buffered entries to the log file"""
+        self._writer.flush()
+            
+    def close(self) -> None:
+        """Flush buffered entries and close the log file"""
+        self._finalizer()
             
     def get_recent_logs(self, n: int = 10) -> List[Dict[str, Any]]:
         """
@@ -67,12 +191,28 @@ class RAGLogger:
         Returns:
             List[Dict[str, Any]]: List of recent log entries
         """
-        if not self._get_log_file().exists():
+        self.flush()
+        log_file = self._get_log_file()
+        if not log_file.exists():
             return []
             
-        logs = []
-        with open(self._get_log_file(), 'r') as f:
-            for line in f:
-                logs.append(json.loads(line))
+        if n <= 0:
+            return []
+        
+        # Read backwards in blocks until n complete lines are buffered, so the
+        # cost depends on n rather than the size of the file
+        with open(log_file, 'rb') as f:
+            f.seek(0, 2)
+            pos = f.tell()
+            buf = b""
+            while pos > 0 and buf.count(b"\n") <= n:
+                step = min(TAIL_BLOCK_SIZE, pos)
+                pos -= step
+                f.seek(pos)
+                buf = f.read(step) + buf
                 
-        return logs[-n:] 
\ No newline at end of file
+        # When the read stopped mid-file the first line may be partial; drop it
+        lines = buf.splitlines()
+        if pos > 0:
+            lines = lines[1:]
+        return [orjson.loads(line) for line in lines[-n:] if line.strip()] 
\ No newline at end of file
@@ -0,0 +1,159 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Hashable, Optional
+import pickle
+import threading
+import time
+
+import faiss
+import numpy as np
+
+# Nearest cached queries examined per lookup, so an entry with a different tag
+# (e.g. another k) cannot hide a matching one
+LOOKUP_CANDIDATES = 8
+
+class SemanticCache:
+    def __init__(self,
+                 embedding_dim: int,
+                 threshold: float = 0.95,
+                 ttl: float = 300.0,
+                 max_entries: int = 1024):
+        """
+        Cache of results keyed by query embedding. A lookup hits when a cached
+        query has cosine similarity of at least `threshold` with the new one.
+        
+        Args:
+            embedding_dim (int): Dimension of the (L2-normalized) query embeddings
+            threshold (float): Minimum cosine similarity for a hit
+            ttl (float): Seconds an entry stays valid
+            max_entries (int): Maximum number of entries before LRU eviction
+        """
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(embedding_dim))
+        self.entries = OrderedDict()  # id -> (timestamp, tag, value), least recently used first
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        
+    def get(self, embedding: np.ndarray, tag: Hashable = None) -> Optional[Any]:
+        """
+        Look up the value cached for the most similar query with the same tag.
+        
+        Args:
+            embedding (np.ndarray): Normalized query embedding of shape (1, dim)
+            tag (Hashable): Further part of the key that must match exactly,
+                such as the number of retrieved chunks
+            
+        Returns:
+            The cached value, or None on a miss
+        """
+        with self._lock:
+            value = self._lookup(embedding, tag)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+        
+    def _lookup(self, embedding: np.ndarray, tag: Hashable) -> Optional[Any]:
+        if not self.entries:
+            return None
+        scores, ids = self.index.search(embedding, min(LOOKUP_CANDIDATES, len(self.entries)))
+        now = time.time()
+        for score, entry_id in zip(scores[0], ids[0]):
+            entry_id = int(entry_id)
+            if entry_id < 0 or score < self.threshold:
+                break
+            timestamp, entry_tag, value = self.entries[entry_id]
+            if now - timestamp > self.ttl:
+                self._evict(entry_id)
+                continue
+            if entry_tag == tag:
+                self.entries.move_to_end(entry_id)
+                return value
+        return None
+        
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+        
+    def put(self, embedding: np.ndarray, value: Any, tag: Hashable = None) -> None:
+        """
+        Cache a value under a query embedding, evicting the least recently used
+        entry when full.
+        
+        Args:
+            embedding (np.ndarray): Normalized query embedding of shape (1, dim)
+            value (Any): Value to cache
+            tag (Hashable): Further part of the key, matched exactly by `get`
+        """
+        with self._lock:
+            if len(self.entries) >= self.max_entries:
+                self._evict(next(iter(self.entries)))
+            
+            entry_id = self._next_id
+            self._next_id += 1
+            self.index.add_with_ids(embedding, np.array([entry_id], dtype=np.int64))
+            self.entries[entry_id] = (time.time(), tag, value)
+            
+    def clear(self) -> None:
+        """Drop every cached entry"""
+        with self._lock:
+            self.index.reset()
+            self.entries.clear()
+            
+    def save(self, filepath: str, key: str = "") -> None:
+        """
+        Write the cache to disk so a later process can reuse it.
+        
+        Args:
+            filepath (str): Path of the pickle file
+            key (str): Identifies what the cached values depend on; `load`
+                ignores files saved under a different key
+        """
+        with self._lock:
+            state = {
+                'key': key,
+                'index': faiss.serialize_index(self.index),
+                'entries': self.entries,
+                'next_id': self._next_id
+            }
+            Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+            with open(filepath, 'wb') as f:
+                pickle.dump(state, f)
+                
+    def load(self, filepath: str, key: str = "") -> bool:
+        """
+        Restore a cache written by `save`, dropping entries past their TTL.
+        
+        Args:
+            filepath (str): Path of the pickle file
+            key (str): Must match the key the file was saved with
+            
+        Returns:
+            bool: True if the file existed and was loaded
+        """
+        if not Path(filepath).exists():
+            return False
+        with open(filepath, 'rb') as f:
+            state = pickle.load(f)
+        if state['key'] != key:
+            return False
+        
+        with self._lock:
+            self.index = faiss.deserialize_index(state['index'])
+            self.entries = state['entries']
+            self._next_id = state['next_id']
+            now = time.time()
+            for entry_id in [i for i, (ts, _, _) in self.entries.items() if now - ts > self.ttl]:
+                self._evict(entry_id)
+        return True
+            
+    def _evict(self, entry_id: int) -> None:
+        self.index.remove_ids(np.array([entry_id], dtype=np.int64))
+        del self.entries[entry_id]